@@ -0,0 +1,76 @@
+"""
+Times the interpreted, compiled (with and without the shared `PatternMatcher` scan) and columnar Filter paths over 10,000 items.
+Run with `python tests/benchmark_filters.py`.
+"""
+import time
+
+import conftest
+from test_filter_equivalence import interpreted, make_items
+from tsai._services.filter.columns import ItemColumns
+from tsai._services.filter.compiler import FilterCompiler
+from tsai._services.filter.fixedlists import FixedLists
+from tsai._services.filter.implementations import AllFilter, AnyFilter, NameFilter, NotFilter, PropertyFilter, TypeFilter, TypeRangeFilter
+from tsai._services.filter.patternmatcher import PatternMatcher
+from tsai._services.filter.tooltipcache import TooltipCache
+from tsai._services.filter.utilities import FilterUtils
+
+ItemCount = 10000
+Configs = [
+    ("Instruments", [FixedLists.Instruments]),
+    ("Slayers", [FixedLists.Slayers]),
+    ("Jewelry", [FixedLists.Jewelry]),
+    ("Shorthand", ["wand & unidentified", "giant killer", "luck >= 50"]),
+    ("Graphic or Serial", [0xeb3, 0x40000005]),
+    ("Nested", [AllFilter([NotFilter(NameFilter("ring")), TypeRangeFilter(0x1000, 0x1010)]), AnyFilter([NameFilter("a", hue=33), PropertyFilter("luck 100", partial_match=False)])]),
+    ("Hued Graphics", [TypeFilter(0xeb3, 0), TypeFilter(0xe9d), TypeFilter(0x2805)]),
+]
+
+
+def measure(test):
+    start = time.perf_counter()
+    result = test()
+    return result, (time.perf_counter() - start) / ItemCount * 1e6
+
+
+def run_compiled(predicate, items):
+    results = []
+    for item in items:
+        FilterCompiler.NextItem()
+        results.append(predicate(item))
+    return results
+
+
+def main():
+    items = make_items(ItemCount, 1)
+    # Warm the tooltip cache so every path reads the same cached lines
+    for item in items:
+        TooltipCache.GetLines(item)
+
+    print("{:<20} {:>14} {:>14} {:>14} {:>14} {:>8}".format("Config", "Interpreted", "Compiled", "Shared Scan", "TestMany", "Passed"))
+    for name, filters in Configs:
+        FilterUtils.ResolveFilters(filters, "&", {})
+        expected, interpreted_us = measure(lambda: [interpreted(filters, item) for item in items])
+
+        # Default, each Name/Property Filter scans the text directly
+        PatternMatcher.Build((), ())
+        predicate = FilterUtils.Compile(filters)
+        results, compiled_us = measure(lambda: run_compiled(predicate, items))
+        assert results == expected, name
+
+        # `SystemConfig.SharePatternScans`, a single shared scan per item
+        FilterUtils.BuildPatternMatcher(filters)
+        shared_predicate = FilterUtils.Compile(filters)
+        results, shared_us = measure(lambda: run_compiled(shared_predicate, items))
+        assert results == expected, name
+        PatternMatcher.Build((), ())
+
+        columns = ItemColumns(items)
+        passed, columnar_us = measure(lambda: set(columns.Indexes(AnyFilter(filters).TestMany(columns))))
+        assert [i in passed for i in range(ItemCount)] == expected, name
+
+        print("{:<20} {:>11.2f} us {:>11.2f} us {:>11.2f} us {:>11.2f} us {:>8}".format(name, interpreted_us, compiled_us, shared_us, columnar_us, sum(expected)))
+        FilterCompiler.ClearShared()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import builtins
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeItem:
+    """Stand-in for a Legion item with the attributes the Filters read"""
+    def __init__(self, serial, graphic, hue=0, name="", properties=(), amount=1, container=0):
+        self.Serial = serial
+        self.Graphic = graphic
+        self.Hue = hue
+        self.Name = name
+        self.Amount = amount
+        self.Container = container
+        self.properties = list(properties)
+
+
+class FakeAPI:
+    """The part of Legion's `API` used by the Filters"""
+    items = {}
+
+    @classmethod
+    def ItemNameAndProps(cls, serial, wait=False, timeout=10):
+        item = cls.items.get(serial)
+        if item == None:
+            return None
+        return "\n".join([item.Name] + item.properties)
+
+
+    @classmethod
+    def FindItem(cls, serial):
+        return cls.items.get(serial)
+
+
+    @classmethod
+    def Pause(cls, seconds):
+        pass
+
+
+builtins.API = FakeAPI
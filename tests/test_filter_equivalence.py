@@ -0,0 +1,138 @@
+import random
+
+import pytest
+
+from conftest import FakeAPI, FakeItem
+from tsai._services.filter.columns import ItemColumns
+from tsai._services.filter.compiler import FilterCompiler
+from tsai._services.filter.fixedlists import FixedLists
+from tsai._services.filter.implementations import AllFilter, AnyFilter, MaxPropertyCountFilter, NameFilter, NotFilter, PropertyFilter, PropertyMaxFilter, PropertyMinFilter, PropertyRangeFilter, SerialFilter, TypeFilter, TypeRangeFilter
+from tsai._services.filter.patternmatcher import PatternMatcher
+from tsai._services.filter.tooltipcache import TooltipCache
+from tsai._services.filter.utilities import FilterUtils
+
+GRAPHICS = [0xe9d, 0xeb3, 0x2805, 0x1f03, 0xf7a, 0x108a, 0x1086, 0x1000, 0x1005, 0x1010]
+HUES = [0, 0, 0, 33, 1152]
+NAMES = ["a gold ring", "a string", "an earring", "a wand", "a lute", "a harp", "a bracelet", "a scroll", "shield", "magic sword", ""]
+PROPERTIES = ["unidentified", "artifact", "weapon damage 10", "giant killer", "luck 100", "luck 40", "lower reagent cost 20%", "requirement: 40 str", "durability 50 / 255"]
+NAME_PATTERNS = ["ring", "a wand", "shield", "gold ring", "s", "", "sword"]
+PROPERTY_PATTERNS = ["unidentified", "artifact", "giant killer", "luck", "luck 100", "cost 20%", "40"]
+SHORTHAND = ["wand & unidentified", "ring", "artifact", "luck >= 50", "lower reagent cost <= 10", "ring & & luck"]
+
+
+def make_items(count, seed):
+    generator = random.Random(seed)
+    FakeAPI.items.clear()
+    items = []
+    for i in range(count):
+        item = FakeItem(
+            0x40000000 + i,
+            generator.choice(GRAPHICS),
+            generator.choice(HUES),
+            generator.choice(NAMES),
+            generator.sample(PROPERTIES, generator.randint(0, 4)),
+            generator.randint(1, 3))
+        FakeAPI.items[item.Serial] = item
+        items.append(item)
+    return items
+
+
+def make_leaf(generator, items):
+    kind = generator.randrange(11)
+    if kind == 0:
+        return TypeFilter(generator.choice(GRAPHICS), generator.choice([-1, -1, 0, 33]))
+    if kind == 1:
+        return SerialFilter(generator.choice(items).Serial)
+    if kind == 2:
+        start = generator.choice(GRAPHICS)
+        return TypeRangeFilter(start, start + generator.randint(-4, 32))
+    if kind == 3:
+        return NameFilter(generator.choice(NAME_PATTERNS), generator.choice([-1, -1, 33]), generator.random() < 0.8)
+    if kind == 4:
+        return PropertyFilter(generator.choice(PROPERTY_PATTERNS), generator.choice([-1, -1, 1152]), generator.random() < 0.8)
+    if kind == 5:
+        return PropertyRangeFilter("luck", generator.choice([None, 50, 100]), generator.choice([None, 60, 200]))
+    if kind == 6:
+        return generator.choice([PropertyMinFilter("weapon damage", 5), PropertyMaxFilter("lower reagent cost", 10)])
+    if kind == 7:
+        return MaxPropertyCountFilter(generator.randint(0, 3))
+    if kind == 8:
+        return generator.choice(SHORTHAND)
+    if kind == 9:
+        return generator.choice(GRAPHICS)  # Shorthand Graphic or Serial
+    return generator.choice([FixedLists.Instruments, FixedLists.Slayers, FixedLists.Jewelry])
+
+
+def make_tree(generator, items, depth):
+    if depth == 0 or generator.random() < 0.3:
+        return make_leaf(generator, items)
+
+    kind = generator.randrange(3)
+    if kind == 0:
+        return NotFilter(make_tree(generator, items, depth - 1))
+    children = [make_tree(generator, items, depth - 1) for _ in range(generator.randint(0, 4))]
+    return AllFilter(children) if kind == 1 else AnyFilter(children)
+
+
+def make_config(seed, items):
+    """Random Organizer Filter lists, resolved the same way as `Main`"""
+    generator = random.Random(seed)
+    interned = {}
+    organizers = []
+    for _ in range(generator.randint(1, 4)):
+        filters = [make_tree(generator, items, 3) for _ in range(generator.randint(1, 3))]
+        FilterUtils.ResolveFilters(filters, "&", interned)
+        organizers.append([filter for filter in filters if filter != None])
+    return organizers
+
+
+def interpreted(filters, item):
+    return any(filter.Test(item) for filter in filters)
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    yield
+    TooltipCache.Clear()
+    PatternMatcher.Clear()
+    PatternMatcher.Build((), ())
+    FilterCompiler.ClearShared()
+
+
+@pytest.mark.parametrize("shared_scan", [False, True])
+@pytest.mark.parametrize("seed", range(200))
+def test_compiled_and_columnar_match_interpreted(seed, shared_scan):
+    items = make_items(150, seed)
+    organizers = make_config(seed, items)
+    if shared_scan:
+        FilterUtils.BuildPatternMatcher([filter for filters in organizers for filter in filters])
+    predicates = [FilterUtils.Compile(filters) for filters in organizers]
+    columns = ItemColumns(items)
+
+    for filters, predicate in zip(organizers, predicates):
+        expected = [interpreted(filters, item) for item in items]
+
+        compiled = []
+        for item in items:
+            FilterCompiler.NextItem()
+            compiled.append(predicate(item))
+        assert compiled == expected, list(map(str, filters))
+
+        passed = set(columns.Indexes(AnyFilter(filters).TestMany(columns)))
+        assert [i in passed for i in range(len(items))] == expected, list(map(str, filters))
+
+
+def test_compiled_shared_filters_are_evaluated_per_item():
+    items = make_items(50, 1)
+    shared = ["wand & unidentified", "ring"]
+    organizers = [list(shared), list(shared) + [0xeb3]]
+    interned = {}
+    for filters in organizers:
+        FilterUtils.ResolveFilters(filters, "&", interned)
+    assert organizers[0][0] is organizers[1][0]
+
+    predicates = [FilterUtils.Compile(filters) for filters in organizers]
+    for item in items:
+        FilterCompiler.NextItem()
+        for filters, predicate in zip(organizers, predicates):
+            assert predicate(item) == interpreted(filters, item)
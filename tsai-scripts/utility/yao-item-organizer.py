@@ -9,6 +9,7 @@ Version: v1.0 (Legion)
 #import API
 
 import System
+import time
 from tsai._services.filter.useroptions import UserOptions
 
 
@@ -37,6 +38,9 @@ def GetOrganizers():
     Warning: The order of your Organizers matters. Organizers are executed from first to last (top-down order).
     An item will be moved to the Destination first Organizer whose Filter passed
 
+    Organizer(<Source>, <Destination>, <Filters>, value=<Number>)
+    - Value - Optional. With `Time_Budget_Seconds`, moves of higher value Organizers are made first, then moves in Organizer order (default 1)
+
     Shorthand notation:
     - You may use number (0xab3) (0x123abc) values to check against an item's Grapich/ID or Serial
     - You may use string ("this is a string") values to check against item's `Name` or `Property values`
@@ -45,6 +49,9 @@ def GetOrganizers():
         - Filter = "wand & unidentified"
         - Item must contain "wand" in the `Name` or `Property values`
         - Item must contain "unidentified" in the `Name` or `Property values`
+    - String notation may also compare a numeric `Property value` with `>=` or `<=`
+      - Example: Luck between 100 and 150
+        - Filter = "luck >= 100 & luck <= 150"
 
     Combining filters:
     - As use-cases evolve, you may need to invert filters to exclude items
@@ -121,6 +128,24 @@ from tsai._services.filter.implementations import *
 # Filter Utilities
 #---------------------------------------
 from tsai._services.filter.utilities import *
+from tsai._services.filter.compiler import CompiledFilter, FilterCompiler
+from tsai._services.filter.dispatch import OrganizerIndex
+from tsai._services.filter.patternmatcher import PatternMatcher
+from tsai._services.filter.columns import ItemColumns
+from tsai._services.filter.decisioncache import DecisionCache
+from tsai._services.filter.profiler import FilterProfiler
+from tsai._services.filter.shadowing import ShadowAnalysis
+from tsai._services.filter.tooltipcache import TooltipCache
+from tsai._gumps.progress import ProgressGump
+from tsai._services.inventory.index import InventoryIndex
+from tsai._services.organizer.capacity import CapacityLedger
+from tsai._services.organizer.checkpoint import RunCheckpoint
+from tsai._services.organizer.containerregistry import ContainerRegistry
+from tsai._services.organizer.containertracker import ContainerTracker
+from tsai._services.organizer.moveplan import MovePlan
+from tsai._services.organizer.movequeue import MoveQueue
+from tsai._services.organizer.negativecache import NegativeMatchCache
+from tsai._services.organizer.snapshot import SourceSnapshot
 
 
 #------------------------
@@ -133,50 +158,101 @@ from tsai._services.filter.fixedlists import FixedLists
 # Organizer
 #------------------------
 class Organizer:
-    def __init__(self, source, destination, filters):
+    def __init__(self, source, destination, filters, value=1):
         self.source = source
         self.destination = destination
         self.filters = filters
+        self.value = value
+        self.predicate = None
+
+    def Compile(self):
+        self.predicate = FilterUtils.Compile(self.filters)
 
     def Test(self, item):
+        if self.predicate:
+            return self.predicate(item)
+
         for filter in self.filters:
             if filter.Test(item):
                 return True
         return False
 
+    def TestMany(self, columns, within=None):
+        return AnyFilter(self.filters).TestMany(columns, within)
+
+    def Cost(self):
+        return AnyFilter(self.filters).Cost
+
+    def Key(self):
+        destinations = self.destination if isinstance(self.destination, list) else [self.destination]
+        return (self.source, tuple(destinations), AnyFilter(self.filters).Key())
+
 
 #------------------------
 # Item Utilities
 #------------------------
 class ItemUtils:
     @classmethod
-    def GetItemsRecursive(cls, source_container, items, process_item_predicate, include_children=True):
-        container_items = API.ItemsInContainer(source_container, False)
-
-        for item in container_items:
-            if not process_item_predicate(item):
-                continue
-
-            if include_children and cls.HasProperty(item, "contents:"):
-                container = cls.OpenContainer(item.Serial)
-                if container == None:
+    def IterItemsRecursive(cls, source_container, process_item_predicate, include_children=True, look_ahead=True, snapshot=None, prefetch=True, inventory=None, read_item_predicate=None):
+        """
+        Yields the `(container, items)` found in each container, as soon as that container is read
+        - `read_item_predicate` - Optional. Checked before any tooltip is fetched, items that fail it are skipped
+        """
+        containers = [source_container]
+        try:
+            while containers:
+                container = containers.pop(0)
+                if container != source_container and cls.OpenContainer(container) == None:
                     continue
 
-                cls.GetItemsRecursive(item.Serial, items, process_item_predicate, include_children)
-            else:
-                items.append(item)
-
-    @classmethod
-    def HasProperty(cls, item, substring):
-        name_and_props = API.ItemNameAndProps(item.Serial, False)
-        if not name_and_props:
-            return False
-
-        properties = name_and_props.lower().split('\n')[1:]
-        for property in properties:
-            if substring in property:
-                return True
-        return False
+                container_item = API.FindItem(container)
+                if snapshot != None and container_item != None:
+                    snapshot.Record(container_item)
+                    if not ContainerTracker.IsLoaded(container):
+                        snapshot.MarkChanged(container)  # Some items may be missing, read it again next run
+
+                container_items = API.ItemsInContainer(container, False)
+                if read_item_predicate != None:
+                    container_items = [item for item in container_items if read_item_predicate(item)]
+                if prefetch:
+                    # Filters only see complete tooltips, the rest wait for the next run
+                    pending = TooltipCache.Prefetch(container_items)
+                    if pending:
+                        API.SysMsg("Skipping {} items in ({}). Tooltips did not load.".format(len(pending), hex(container)))
+                        if snapshot != None:
+                            snapshot.MarkChanged(container)
+                        pending = set(item.Serial for item in pending)
+                        container_items = [item for item in container_items if item.Serial not in pending]
+
+                if inventory != None and container_item != None:
+                    inventory.UpsertContainer(container_item, API.ItemsInContainer(container, False), TooltipCache.GetLines, SourceSnapshot.GetFingerprint(container_item))
+
+                items = []
+                for item in container_items:
+                    if not process_item_predicate(item):
+                        continue
+
+                    if include_children and ContainerRegistry.IsContainer(item):
+                        # Nothing inside passed an Organizer last run, and nothing changed since
+                        if snapshot == None or not snapshot.IsUnchanged(item):
+                            containers.append(item.Serial)
+                        elif inventory != None:
+                            inventory.Touch(item.Serial)
+                    else:
+                        items.append(item)
+
+                # Let the next container load while these items are processed
+                if look_ahead and containers:
+                    ContainerTracker.Request(containers[0])
+
+                yield container, items
+        finally:
+            # When the caller stops early, the parents of the unread containers must be read again next run
+            if snapshot != None:
+                for container in containers:
+                    container_item = API.FindItem(container)
+                    if container_item != None:
+                        snapshot.MarkChanged(container_item.Container)
 
     @classmethod
     def OpenContainer(cls, serial):
@@ -185,38 +261,11 @@ class ItemUtils:
             API.SysMsg("Failed to find container ({})".format(hex(serial)))
             return None
 
-        # TODO: Can we check to make sure a container's contents are loaded?
-        API.UseObject(item.Serial)
-        API.Pause(1.0)
+        if not ContainerTracker.Open(item.Serial):
+            API.SysMsg("Timed out loading container ({})".format(hex(serial)))
 
         return item.Serial
 
-    @classmethod
-    def HasCapacity(cls, serial, reserved_space=5):
-        item = API.FindItem(serial)
-        if item == None:
-            return False
-
-        name_and_props = API.ItemNameAndProps(serial, False)
-        if not name_and_props:
-            return True  # Assume it has capacity if we can't check
-
-        props = name_and_props.split('\n')[1:]
-
-        # Look for "Contents: X/Y items"
-        for line in props:
-            if line.strip().startswith("Contents"):
-                # Parse "Contents: 123/125 items" format
-                try:
-                    parts = line.split(':')[1].strip().split('/')
-                    current = int(parts[0].strip())
-                    max_items = int(parts[1].split()[0].strip())
-                    return current < (max_items - reserved_space)
-                except:
-                    return True
-
-        return True
-
 
 #------------------------
 # Movement
@@ -247,54 +296,379 @@ class Runner:
 # Runner
 #------------------------
 class OrganizerRunner:
-    def __init__(self):
+    def __init__(self, config_hash=None):
         self.prompt_serial = None
+        self.config_hash = config_hash
+        self.capacity = CapacityLedger()
+        self.moves = MoveQueue() if SystemConfig.PipelineMoves else None
+        self.progress = None
+        self.inventory = None
+        self.scanned = 0
+        self.matched = 0
+        self.moved = 0  # Only counted without a MoveQueue, the queue counts its confirmed moves
+        self.current_destination = None
+        self.started_at = time.time()
+        self.deadline = None
+        self.priorities = {}
+        self.deferred = []
 
     def Validate(self, organizers):
         for organizer in organizers:
             if not self.__getDestination(organizer.destination):
                 API.SysMsg("Failed to open Destination ({}).".format(organizer.destination))
 
-    def Process(self, organizers, ignored_filter):
+    def Process(self, organizers, ignored_filter, time_budget=None):
+        """
+        - `time_budget` - Optional. Seconds to run for. Moves are always planned, the most valuable are made first and the rest are deferred to the next run
+        """
+        self.deadline = time.time() + time_budget if time_budget else None
+        # Higher value first, then the Organizer order
+        self.priorities = {organizer: (-organizer.value, i) for i, organizer in enumerate(organizers)}
+        if UserOptions.Show_Progress:
+            self.progress = ProgressGump("YAO - Organizing")
+        if SystemConfig.InventoryDatabasePath:
+            if InventoryIndex.IsAvailable():
+                self.inventory = InventoryIndex(SystemConfig.InventoryDatabasePath)
+            else:
+                API.SysMsg("SQLite is not available. The inventory index is disabled.")
+
+        try:
+            self.__process(organizers, ignored_filter)
+        finally:
+            if self.progress != None:
+                self.progress.close()
+            if self.inventory != None:
+                self.inventory.Close()
+
+        if self.deferred:
+            for entry in self.deferred:
+                print("Deferred: {} ({}) to ({})".format(entry.item.Name, hex(entry.item.Serial), hex(entry.destination)))
+            API.SysMsg("Stopped early. Deferred {} moves to the next run.".format(len(self.deferred)))
+
+    def GetSummary(self):
+        if self.moves != None:
+            per_minute = self.moves.GetItemsPerMinute()
+        else:
+            elapsed = time.time() - self.started_at
+            per_minute = self.moved * 60 / elapsed if 0 < elapsed else 0
+        summary = "Scanned {}, matched {}, moved {} items ({} per minute).".format(self.scanned, self.matched, self.__getMoved(), int(per_minute))
+        if self.moves != None and self.moves.failed:
+            summary += " Failed {}.".format(len(self.moves.failed))
+        if self.deferred:
+            summary += " Deferred {}.".format(len(self.deferred))
+        return summary
+
+    def __process(self, organizers, ignored_filter):
         # Aggregate by Source and Destination
         organizers_by_source = self.__groupBySource(organizers)
+        indexes_by_source = {source: OrganizerIndex(organizers_by_source[source]) for source in organizers_by_source}
+        if SystemConfig.PrefetchTooltips:
+            # Destination capacity is read from the tooltips
+            self.__prefetchDestinations(organizers)
+
+        checkpoint = None
+        if SystemConfig.CheckpointInterval and self.config_hash and not UserOptions.Dry_Run:
+            checkpoint = RunCheckpoint(self.config_hash, API.PersistentVar.Char, SystemConfig.CheckpointInterval)
+
         for source in organizers_by_source:
             source_serial = self.__resolveSource(source)
+            if checkpoint != None and checkpoint.IsFinished(source_serial):
+                API.SysMsg("Skipping Source ({}). Finished by the previous run.".format(source))
+                continue
 
             source_container = ItemUtils.OpenContainer(source_serial)
             if not source_container:
                 API.SysMsg("Failed to open Source ({}).".format(source))
                 return
 
-            # Get all the items
-            items = []
-            ItemUtils.GetItemsRecursive(source_container, items, lambda item: ignored_filter == None or not ignored_filter.Test(item), UserOptions.Open_Child_Containers)
-            total_items = len(items)
+            unmatched = None
+            if SystemConfig.CacheUnmatchedItems and self.config_hash:
+                unmatched = NegativeMatchCache(source_serial, self.config_hash, API.PersistentVar.Char)
+
+            snapshot = None
+            if SystemConfig.SnapshotSources and self.config_hash:
+                snapshot = SourceSnapshot(source_serial, self.config_hash, API.PersistentVar.Char)
+
+            if UserOptions.Full_Scan:
+                # Evaluate everything again, the results are still saved for the next run
+                if unmatched != None:
+                    unmatched.Clear()
+                if snapshot != None:
+                    snapshot.Clear()
+
+            try:
+                finished = self.__processSource(source_container, organizers_by_source[source], indexes_by_source[source], ignored_filter, unmatched, snapshot, checkpoint)
+                if self.moves != None:
+                    self.moves.Flush()
+            finally:
+                if unmatched != None:
+                    unmatched.Save()
+                if snapshot != None:
+                    snapshot.Save()
+
+            if not finished or self.__shouldStop():
+                if checkpoint != None:
+                    checkpoint.Save()
+                return  # Resume from the checkpoint next run
+            if checkpoint != None:
+                checkpoint.FinishSource(source_serial)
+
+        if checkpoint != None:
+            checkpoint.Clear()
+
+    def __processSource(self, source_container, organizers, index, ignored_filter, unmatched, snapshot, checkpoint):
+        """Returns `False` if the time budget ended the scan before every container of the Source was read"""
+        if checkpoint != None and self.__isPlanning():
+            entries = checkpoint.GetEntries(source_container)
+            if entries != None:
+                # Every container of this Source was already read, only the remaining moves are left
+                API.SysMsg("Resuming {} planned moves.".format(len(entries)))
+                plan = self.__restorePlan(entries, organizers)
+                if self.deadline != None:
+                    plan.OrderByPriority(self.priorities.get)
+                self.__executePlan(plan, checkpoint)
+                return True
+
+        decisions = DecisionCache(organizers)
+        plan = MovePlan()
+
+        # Items are classified, and moved unless planning, as each container is read
+        item_batches = ItemUtils.IterItemsRecursive(source_container,
+            lambda item: self.__shouldProcess(item, ignored_filter, unmatched),
+            UserOptions.Open_Child_Containers,
+            SystemConfig.LookAheadContainers,
+            snapshot,
+            SystemConfig.PrefetchTooltips,
+            self.inventory,
+            lambda item: self.__shouldRead(item, unmatched))
+        scan_finished = True
+        for container, items in item_batches:
+            if unmatched != None:
+                unmatched.MarkRead(container)
+            self.scanned += len(items)
+            self.__updateProgress()
+
+            # Classify every item of the container in a single pass
+            first_matches = self.__classifyMany(items, organizers) if SystemConfig.BatchFilters else None
 
-            # Process the list of items
             for i, item in enumerate(items):
-                API.SysMsg("Processing item ({} of {}).".format(i + 1, total_items))
+                FilterCompiler.NextItem()
                 if ignored_filter != None and ignored_filter.Test(item):
                     continue
 
-                for organizer in organizers_by_source[source]:
-                    if organizer.Test(item):
-                        # Find the first container with capacity
-                        destination = self.__getDestination(organizer.destination)
-                        if destination == None:
-                            API.SysMsg("Skipping organizer. Failed to find Destination with capacity ({}).".format(organizer.destination))
-                            continue
+                if first_matches != None:
+                    first_match = first_matches[i] or DecisionCache.NoMatch
+                else:
+                    first_match = decisions.Get(item)
 
-                        if UserOptions.Move_To_Destination:
-                            if not self.__moveToDestination(destination):
-                                API.SysMsg("Failed to move to Destination ({}).".format(hex(destination) if isinstance(destination, System.UInt32) else destination))
+                match = self.__classify(item, index, first_match, decisions, unmatched, snapshot)
+                if match == None:
+                    continue
+
+                self.matched += 1
+                self.__updateProgress()
+                organizer, destination = match
+                if self.__isPlanning():
+                    plan.Add(item, organizer, destination, self.__getPosition(destination))
+                    continue
 
-                        if UserOptions.Output_Item_Move_Messages:
-                            API.SysMsg("Moved ({}) to ({})".format(item.Name, hex(destination)))
+                self.__travelTo(destination)
+                self.__moveItem(item, destination)
+
+            if API.StopRequested:
+                item_batches.close()
+                self.deferred.extend(entry for stop in plan.stops for entry in stop.entries)
+                return True
+            if self.__isScanOverBudget(plan):
+                # Leave the rest of the budget to the planned moves, the unread containers are read next run
+                item_batches.close()
+                scan_finished = False
+                API.SysMsg("Time budget: stopped reading the Source to make {} planned moves.".format(plan.Count()))
+                break
+
+        if plan.Count() == 0:
+            return scan_finished
+
+        start = (API.Player.X, API.Player.Y)
+        plan.OrderRoute(start)
+        if UserOptions.Dry_Run:
+            for line in plan.Describe(start):
+                print(line)
+            API.SysMsg("Dry run: {} items to {} destinations, ~{}s.".format(plan.Count(), len(plan.stops), int(plan.EstimateSeconds(start))))
+            return scan_finished
+
+        if self.deadline != None:
+            plan.OrderByPriority(self.priorities.get)
+        if not scan_finished:
+            # Only a complete plan is checkpointed, this Source is read again next run
+            self.__executePlan(plan)
+            return False
+        if checkpoint != None:
+            checkpoint.Begin(source_container, [(entry.item.Serial, stop.destination, organizers.index(entry.organizer)) for stop in plan.stops for entry in stop.entries])
+        self.__executePlan(plan, checkpoint)
+        return True
+
+    def __classify(self, item, index, first_match, decisions, unmatched, snapshot):
+        """Returns the first `(organizer, destination)` that passes the item and has capacity, or `None`"""
+        if first_match == DecisionCache.NoMatch:
+            if unmatched != None:
+                unmatched.Add(item)
+            return None
+
+        matched = False
+        for organizer in self.__getMatches(item, index, first_match, decisions):
+            if not matched and snapshot != None:
+                snapshot.MarkChanged(item.Container)
+            matched = True
+            # Find the first container with capacity
+            destination = self.__getDestination(organizer.destination, item)
+            if destination == None:
+                API.SysMsg("Skipping organizer. Failed to find Destination with capacity ({}).".format(organizer.destination))
+                continue
 
-                        API.MoveItem(item.Serial, destination)
-                        API.Pause(1.0)
-                        break
+            self.capacity.Add(destination, item)
+            return organizer, destination
+
+        if not matched and unmatched != None:
+            unmatched.Add(item)
+        return None
+
+    def __executePlan(self, plan, checkpoint=None):
+        for i, stop in enumerate(plan.stops):
+            if self.__shouldStop():
+                self.deferred.extend(entry for remaining in plan.stops[i:] for entry in remaining.entries)
+                return
+
+            self.__travelTo(stop.destination)
+            for j, entry in enumerate(stop.entries):
+                if self.__shouldStop():
+                    self.deferred.extend(stop.entries[j:])
+                    self.deferred.extend(entry for remaining in plan.stops[i + 1:] for entry in remaining.entries)
+                    return
+
+                self.__moveItem(entry.item, stop.destination)
+                if checkpoint != None:
+                    checkpoint.Complete(entry.item.Serial)
+
+    def __shouldStop(self):
+        return API.StopRequested or (self.deadline != None and self.deadline <= time.time())
+
+    def __isScanOverBudget(self, plan):
+        """With a time budget, reading stops once the planned moves are estimated to take the time that is left"""
+        if self.deadline == None:
+            return False
+        return self.deadline - time.time() <= plan.EstimateSeconds((API.Player.X, API.Player.Y))
+
+    def __isPlanning(self):
+        # Moves can only be ordered by value once they are all known
+        return UserOptions.Plan_Moves or UserOptions.Dry_Run or self.deadline != None
+
+    def __restorePlan(self, entries, organizers):
+        plan = MovePlan()
+        for serial, destination, organizer_index in entries:
+            item = API.FindItem(serial)
+            if item == None or item.Container == destination:
+                continue  # Moved before the checkpoint was saved
+
+            self.capacity.Add(destination, item)
+            plan.Add(item, organizers[organizer_index], destination, self.__getPosition(destination))
+
+        plan.OrderRoute((API.Player.X, API.Player.Y))
+        return plan
+
+    def __travelTo(self, destination):
+        if destination == self.current_destination:
+            return  # Still in range, the queued moves stay in flight
+
+        self.current_destination = destination
+        if not UserOptions.Move_To_Destination or destination == API.Backpack:
+            return
+
+        if self.moves != None:
+            self.moves.Flush()  # Queued moves need their Destination in range until they are confirmed
+        if not self.__moveToDestination(destination):
+            self.current_destination = None
+            API.SysMsg("Failed to move to Destination ({}).".format(hex(destination) if isinstance(destination, System.UInt32) else destination))
+
+    def __updateProgress(self, destination=None):
+        if self.progress != None:
+            self.progress.update(self.scanned, self.matched, self.__getMoved(), destination)
+
+    def __getMoved(self):
+        return self.moves.moved if self.moves != None else self.moved
+
+    def __moveItem(self, item, destination):
+        if UserOptions.Output_Item_Move_Messages:
+            API.SysMsg("Moved ({}) to ({})".format(item.Name, hex(destination)))
+
+        if self.inventory != None:
+            self.inventory.RecordMove(item.Serial, destination)
+
+        if self.moves != None:
+            self.moves.Enqueue(item.Serial, destination)
+            self.__updateProgress(destination)
+            return
+
+        self.moved += 1
+        self.__updateProgress(destination)
+        API.MoveItem(item.Serial, destination)
+        API.Pause(1.0)
+        TooltipCache.Invalidate(item.Serial)
+
+    def __prefetchDestinations(self, organizers):
+        serials = set()
+        for organizer in organizers:
+            destinations = organizer.destination if isinstance(organizer.destination, list) else [organizer.destination]
+            for destination in destinations:
+                if destination != None:
+                    serials.add(self.__resolveDestination(destination))
+
+        items = [API.FindItem(serial) for serial in serials if serial]
+        TooltipCache.Prefetch([item for item in items if item != None])
+
+    def __shouldRead(self, item, unmatched):
+        # Items that passed no Organizer in a previous run are skipped before any tooltip is read
+        return unmatched == None or not unmatched.Contains(item)
+
+    def __shouldProcess(self, item, ignored_filter, unmatched):
+        if ignored_filter != None and ignored_filter.Test(item):
+            if unmatched != None:
+                unmatched.Add(item)
+            return False
+
+        return True
+
+    def __getMatches(self, item, index, first_match=None, decisions=None):
+        """Yields the Organizers that pass the item, in order. `first_match` is already known to pass."""
+        record = first_match == None and decisions != None
+        for organizer in index.GetCandidates(item):
+            if first_match != None:
+                if organizer is not first_match:
+                    continue
+                first_match = None
+                yield organizer
+            elif organizer.Test(item):
+                if record:
+                    decisions.Set(item, organizer)
+                    record = False
+                yield organizer
+
+        if record:
+            decisions.Set(item, DecisionCache.NoMatch)
+
+    def __classifyMany(self, items, organizers):
+        """Returns the first Organizer that passes each item, or `None`"""
+        columns = ItemColumns(items)
+        first_matches = [None] * columns.count
+        remaining = columns.All()
+        for organizer in organizers:
+            if columns.IsEmpty(remaining):
+                break
+            passed = organizer.TestMany(columns, remaining)
+            for i in columns.Indexes(passed):
+                first_matches[i] = organizer
+            remaining = columns.And(remaining, columns.Not(passed))
+        return first_matches
 
     def __resolveSource(self, source):
         if source == SystemContainers.PromptForSource:
@@ -309,7 +683,7 @@ class OrganizerRunner:
         else:
             return source
 
-    def __getDestination(self, destinations):
+    def __getDestination(self, destinations, item=None):
         if not isinstance(destinations, list):
             destinations = [destinations]
 
@@ -318,7 +692,7 @@ class OrganizerRunner:
                 continue
 
             dest_serial = self.__resolveDestination(destination)
-            if dest_serial and ItemUtils.HasCapacity(dest_serial):
+            if dest_serial and self.capacity.HasCapacity(dest_serial, item):
                 return dest_serial
 
         return None
@@ -344,11 +718,40 @@ class OrganizerRunner:
 
         return organizers_by_source
 
+    def __getPosition(self, destination_serial):
+        """Returns the `(x, y)` to travel to for the Destination, or `None` if it's reachable from anywhere"""
+        top_serial = self.__getTopContainer(destination_serial)
+        if top_serial == API.Backpack:
+            return None
+
+        if top_serial == API.Bank:
+            target = API.FindType(0x436)  # Vault
+        else:
+            target = API.FindItem(top_serial)
+
+        if not target or target.Container:
+            return None  # Unknown, or carried by a mobile
+        return (target.X, target.Y)
+
+    def __getTopContainer(self, serial):
+        """Returns the outermost container holding `serial`: the Backpack, the Bank, or a container on the ground"""
+        while serial != API.Backpack and serial != API.Bank:
+            item = API.FindItem(serial)
+            if not item or not item.Container:
+                return serial
+
+            if item.Container != API.Backpack and item.Container != API.Bank and not API.FindItem(item.Container):
+                return serial  # Carried by a mobile
+            serial = item.Container
+
+        return serial
+
     def __moveToDestination(self, destination_serial):
+        top_serial = self.__getTopContainer(destination_serial)
+
         # Special handling for bank
-        if destination_serial == API.Bank:
-            vault_type_id = 0x436
-            vault = API.FindType(vault_type_id)
+        if top_serial == API.Bank:
+            vault = API.FindType(0x436)
             if not vault:
                 API.SysMsg("Failed to find Vault.")
                 return False
@@ -358,11 +761,11 @@ class OrganizerRunner:
                 return False
 
             API.UseObject(vault.Serial)
-            API.Pause(1.0)
+            ContainerTracker.WaitForContents(API.Bank)
 
-        elif destination_serial != API.Backpack:
-            # Move to the destination container
-            if not Runner.MoveTo(destination_serial):
+        elif top_serial != API.Backpack:
+            # Move to the container on the ground
+            if not Runner.MoveTo(top_serial):
                 return False
 
         return True
@@ -373,21 +776,70 @@ class OrganizerRunner:
 #------------------------
 def Main():
     ignored_filter = None
+    interned = {}  # Shared between Organizers, so overlapping rules are evaluated once per item
     ignored_filters = GetIgnoredFilters()
     if 0 < len(ignored_filters):
-        FilterUtils.ResolveFilters(ignored_filters, SystemConfig.AndOperatorCharacter)
+        FilterUtils.ResolveFilters(ignored_filters, SystemConfig.AndOperatorCharacter, interned)
         ignored_filter = AnyFilter(ignored_filters)
 
     organizers = GetOrganizers()
 
     for organizer in organizers:
         # Convert any shorthand
-        FilterUtils.ResolveFilters(organizer.filters, SystemConfig.AndOperatorCharacter)
-        if SystemConfig.LogFilterSummary:
+        FilterUtils.ResolveFilters(organizer.filters, SystemConfig.AndOperatorCharacter, interned)
+
+    if SystemConfig.PruneShadowedFilters:
+        # The first Organizer that passes an item wins, so rules covered by an earlier one are never reached
+        organizers, warnings = ShadowAnalysis.PruneOrganizers(organizers, ignored_filters)
+        for warning in warnings:
+            print(warning)
+        if warnings:
+            API.SysMsg("Skipped {} unreachable Filters and Organizers, see the script output.".format(len(warnings)))
+
+    if SystemConfig.LogFilterSummary:
+        for organizer in organizers:
             print(list(map(str, organizer.filters)))
 
-    runner = OrganizerRunner()
-    runner.Process(organizers, ignored_filter)
+    # Any edit to the Organizers or ignored Filters changes the hash
+    config_hash = FilterUtils.GetConfigHash([
+        SystemConfig.AndOperatorCharacter,
+        [filter.Key() for filter in ignored_filters],
+        [organizer.Key() for organizer in organizers],
+    ])
+
+    if SystemConfig.CompileFilters and SystemConfig.SharePatternScans:
+        # Share a single scan of each item's text between every Filter
+        FilterUtils.BuildPatternMatcher(ignored_filters + [filter for organizer in organizers for filter in organizer.filters])
+
+    if SystemConfig.ProfileFilters:
+        FilterProfiler.Wrap(ignored_filters, "Ignored")
+        for i, organizer in enumerate(organizers):
+            organizer.filters = [AnyFilter(organizer.filters)]
+            FilterProfiler.Wrap(organizer.filters, "Organizer {}".format(i + 1))
+
+    if SystemConfig.CompileFilters:
+        if ignored_filter != None:
+            ignored_filter = CompiledFilter(ignored_filter)
+        for organizer in organizers:
+            organizer.Compile()
+
+    ContainerRegistry.Load(API.PersistentVar.Char)
+    runner = OrganizerRunner(config_hash)
+    try:
+        runner.Process(organizers, ignored_filter, UserOptions.Time_Budget_Seconds)
+    finally:
+        ContainerRegistry.Save(API.PersistentVar.Char)
+        ContainerRegistry.Clear()
+        TooltipCache.Clear()
+        PatternMatcher.Clear()
+        FilterCompiler.ClearShared()
+        ContainerTracker.Clear()
+
+    API.SysMsg(runner.GetSummary())
+
+    if SystemConfig.ProfileFilters:
+        FilterProfiler.Report(json_path=SystemConfig.ProfileReportPath)
+        FilterProfiler.Clear()
 
     API.HeadMsg("Execution Completed", API.Player.Serial)
 
@@ -0,0 +1,39 @@
+class ContainerGraphics:
+    """Graphics that are always containers"""
+    Known = frozenset([
+        0x0E75,  # Backpack
+        0x0E76,  # Bag
+        0x0E79,  # Pouch
+        0x09B0,  # Pouch
+        0x09AA,  # Wooden Box
+        0x0E7D,  # Wooden Box
+        0x09A8,  # Metal Box
+        0x0E80,  # Metal Box
+        0x09AB,  # Metal Chest
+        0x0E7C,  # Metal Chest
+        0x0E40,  # Metal Golden Chest
+        0x0E41,  # Metal Golden Chest
+        0x0E42,  # Wooden Chest
+        0x0E43,  # Wooden Chest
+        0x09A9,  # Small Crate
+        0x0E7E,  # Small Crate
+        0x0E3E,  # Medium Crate
+        0x0E3F,  # Medium Crate
+        0x0E3C,  # Large Crate
+        0x0E3D,  # Large Crate
+        0x0E77,  # Barrel
+        0x0FAE,  # Barrel
+        0x0E7A,  # Picnic Basket
+        0x0A2C,  # Chest of Drawers
+        0x0A30,  # Chest of Drawers
+        0x0A34,  # Dresser
+        0x0A38,  # Dresser
+        0x0A4C,  # Armoire
+        0x0A4D,  # Armoire
+        0x0A4E,  # Armoire
+        0x0A4F,  # Armoire
+        0x0A50,  # Armoire
+        0x0A51,  # Armoire
+        0x0A52,  # Armoire
+        0x0A53,  # Armoire
+    ])
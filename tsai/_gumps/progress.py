@@ -0,0 +1,73 @@
+# import API
+
+import time
+
+from tsai._data.color import Color
+from tsai._gumps._core import Gump
+
+
+class ProgressGump:
+    """
+    Small window showing the progress of a long running script.
+    - `update` may be called for every item, the labels are refreshed at most every `refresh_interval` seconds
+    - Closing the window only hides the progress, the script keeps running
+    """
+    def __init__(self, title, refresh_interval=0.25):
+        self.scanned = 0
+        self.matched = 0
+        self.moved = 0
+        self.destination = None
+        self.refresh_interval = refresh_interval
+        self.started_at = time.time()
+        self.last_refresh = 0
+
+        width = 260
+        height = 130
+        g = Gump(width, height, self.close, False)
+        g.addTtfLabel(title, 5, 0, width, 20, 16, Color.defaultWhite, "left", None)
+        self.counts_label = g.addLabel("", 10, 30)
+        self.rate_label = g.addLabel("", 10, 55)
+        self.destination_label = g.addLabel("", 10, 80)
+        g.create()
+        self.gump = g
+
+
+    def update(self, scanned=None, matched=None, moved=None, destination=None, force=False):
+        if scanned != None:
+            self.scanned = scanned
+        if matched != None:
+            self.matched = matched
+        if moved != None:
+            self.moved = moved
+        if destination != None:
+            self.destination = destination
+
+        now = time.time()
+        if not force and now - self.last_refresh < self.refresh_interval:
+            return
+
+        self.last_refresh = now
+        self.refresh()
+
+
+    def refresh(self):
+        if self.gump == None or self.gump.gump.IsDisposed:
+            return
+
+        per_minute = self.get_items_per_minute()
+        remaining = self.matched - self.moved
+        eta = "{}s".format(int(remaining * 60 / per_minute)) if 0 < per_minute and 0 < remaining else "-"
+        self.counts_label.Text = "Scanned: {}  Matched: {}  Moved: {}".format(self.scanned, self.matched, self.moved)
+        self.rate_label.Text = "Items/min: {}  ETA: {}".format(int(per_minute), eta)
+        self.destination_label.Text = "Destination: {}".format(hex(self.destination) if self.destination != None else "-")
+
+
+    def get_items_per_minute(self):
+        elapsed = time.time() - self.started_at
+        return self.moved * 60 / elapsed if 0 < elapsed else 0.0
+
+
+    def close(self):
+        if self.gump != None:
+            self.gump.destroy()
+            self.gump = None
@@ -0,0 +1,153 @@
+try:
+    import numpy
+except ImportError:
+    numpy = None  # Legion's IronPython doesn't ship NumPy, masks fall back to Python ints
+
+from tsai._services.filter.tooltipcache import TooltipCache
+
+
+class ItemColumns:
+    """
+    Columnar snapshot of a list of items used by each Filter's `TestMany`.
+    - `serials`, `graphics`, `hues` and `amounts` are parallel arrays (NumPy when available)
+    - `names` holds the normalized Names, tooltip lines are fetched lazily and only for the items a Filter still needs
+    - Masks are NumPy boolean arrays or, without NumPy, Python ints where bit `i` is item `i`
+    """
+    def __init__(self, items):
+        self.items = list(items)
+        self.count = len(self.items)
+        self.serials = self.__column([item.Serial for item in self.items])
+        self.graphics = self.__column([item.Graphic for item in self.items])
+        self.hues = self.__column([item.Hue for item in self.items])
+        self.amounts = self.__column([item.Amount for item in self.items])
+        self.names = [item.Name.lower() for item in self.items]
+        self.__lines = [None] * self.count
+        self.__property_texts = [None] * self.count
+
+
+    def GetLines(self, i):
+        """Normalized tooltip lines of item `i`, Name first"""
+        lines = self.__lines[i]
+        if lines == None:
+            lines = TooltipCache.GetLines(self.items[i])
+            self.__lines[i] = lines
+        return lines
+
+
+    def GetProperties(self, i):
+        return self.GetLines(i)[1:]
+
+
+    def GetPropertyValues(self, i):
+        return TooltipCache.GetPropertyValues(self.items[i])
+
+
+    def GetPropertyText(self, i):
+        """Property lines of item `i` joined by line breaks, for a single substring scan"""
+        text = self.__property_texts[i]
+        if text == None:
+            text = "\n".join(self.GetProperties(i))
+            self.__property_texts[i] = text
+        return text
+
+
+    # Masks
+    def All(self):
+        if numpy != None:
+            return numpy.ones(self.count, dtype=bool)
+        return (1 << self.count) - 1
+
+
+    def Nothing(self):
+        if numpy != None:
+            return numpy.zeros(self.count, dtype=bool)
+        return 0
+
+
+    def Within(self, within):
+        return self.All() if within is None else within
+
+
+    def Restrict(self, mask, within):
+        return mask if within is None else mask & within
+
+
+    def IsEmpty(self, mask):
+        if numpy != None:
+            return not mask.any()
+        return mask == 0
+
+
+    def IsSet(self, mask, i):
+        if numpy != None:
+            return bool(mask[i])
+        return (mask >> i) & 1 == 1
+
+
+    def And(self, first, second):
+        return first & second
+
+
+    def Or(self, first, second):
+        return first | second
+
+
+    def Not(self, mask):
+        if numpy != None:
+            return ~mask
+        return self.All() ^ mask
+
+
+    def Indexes(self, mask):
+        if numpy != None:
+            return numpy.flatnonzero(mask).tolist()
+        return [i for i, bit in enumerate(reversed(bin(mask)[2:])) if bit == "1"]
+
+
+    def FromBools(self, bools):
+        if numpy != None:
+            return numpy.fromiter(bools, dtype=bool, count=self.count)
+        return int("".join("1" if value else "0" for value in bools)[::-1] or "0", 2)
+
+
+    def Where(self, predicate, within=None):
+        """Tests `predicate(i)` for every index in `within`. Items outside of `within` are not touched."""
+        if within is None:
+            return self.FromBools(predicate(i) for i in range(self.count))
+
+        if numpy != None:
+            mask = numpy.zeros(self.count, dtype=bool)
+            for i in self.Indexes(within):
+                if predicate(i):
+                    mask[i] = True
+            return mask
+
+        bools = [False] * self.count
+        for i in self.Indexes(within):
+            bools[i] = predicate(i)
+        return self.FromBools(bools)
+
+
+    # Column comparisons
+    def Equals(self, column, value):
+        if numpy != None:
+            return column == value
+        return self.FromBools(entry == value for entry in column)
+
+
+    def InRange(self, column, start, end):
+        if numpy != None:
+            return (start <= column) & (column <= end)
+        return self.FromBools(start <= entry <= end for entry in column)
+
+
+    def IsIn(self, column, values):
+        if numpy != None:
+            return numpy.isin(column, list(values))
+        return self.FromBools(entry in values for entry in column)
+
+
+    def __column(self, values):
+        if numpy != None:
+            return numpy.array(values, dtype=numpy.int64)
+        return values
@@ -0,0 +1,228 @@
+from tsai._services.filter.core import FilterCost
+
+
+class FilterCompiler:
+    """
+    Building blocks used by each Filter's `Compile` to produce a single specialized predicate.
+    - Constants are folded, no-op hue checks are dropped and nested All/Any are flattened
+    - Filters shared between Organizers (see `FilterUtils.ResolveFilters`) are compiled once and evaluated once per item
+    """
+    Generation = 0  # Identifies the item being evaluated, see `NextItem`
+    _shared = {}
+
+    @staticmethod
+    def AlwaysTrue(item):
+        return True
+
+
+    @staticmethod
+    def AlwaysFalse(item):
+        return False
+
+
+    @classmethod
+    def NextItem(cls):
+        """Starts a new item. Results memoized for the previous item are no longer used."""
+        cls.Generation += 1
+
+
+    @classmethod
+    def Share(cls, filter):
+        """Marks a Filter that is referenced more than once"""
+        cls._shared.setdefault(filter, None)
+
+
+    @classmethod
+    def IsShared(cls, filter):
+        return filter in cls._shared
+
+
+    @classmethod
+    def ClearShared(cls):
+        cls._shared.clear()
+
+
+    @classmethod
+    def CompileShared(cls, filter):
+        """Compiles the Filter. A shared Filter is compiled once and memoized per item."""
+        if filter not in cls._shared:
+            return filter.Compile()
+
+        test = cls._shared[filter]
+        if test == None:
+            test = filter.Compile()
+            if filter.Cost != FilterCost.Compare and not cls.IsConstant(test):
+                test = cls.Memoize(test)
+            cls._shared[filter] = test
+        return test
+
+
+    @classmethod
+    def Memoize(cls, test):
+        memo = [None, None, False]  # Generation, Serial, Result
+        def memoized(item):
+            if memo[0] == cls.Generation and memo[1] == item.Serial:
+                return memo[2]
+            result = test(item)
+            memo[0] = cls.Generation
+            memo[1] = item.Serial
+            memo[2] = result
+            return result
+        return memoized
+
+
+    @classmethod
+    def IsConstant(cls, test):
+        return test is cls.AlwaysTrue or test is cls.AlwaysFalse
+
+
+    @classmethod
+    def WithHue(cls, hue, test):
+        """Prepends the hue check, unless it is a no-op"""
+        if hue == -1 or test is cls.AlwaysFalse:
+            return test
+        if test is cls.AlwaysTrue:
+            return lambda item: item.Hue == hue
+        return lambda item: item.Hue == hue and test(item)
+
+
+    @classmethod
+    def Not(cls, test):
+        if test is cls.AlwaysTrue:
+            return cls.AlwaysFalse
+        if test is cls.AlwaysFalse:
+            return cls.AlwaysTrue
+        return lambda item: not test(item)
+
+
+    @classmethod
+    def All(cls, tests):
+        """Combines `(cost, test)` pairs into a predicate that requires every test to pass"""
+        remaining = []
+        for cost, test in tests:
+            if test is cls.AlwaysFalse:
+                return cls.AlwaysFalse
+            if test is not cls.AlwaysTrue:
+                remaining.append((cost, test))
+
+        if not remaining:
+            return cls.AlwaysTrue
+        if len(remaining) == 1:
+            return remaining[0][1]
+        if cls.__isCheap(remaining):
+            remaining = [test for _, test in remaining]
+            if len(remaining) == 2:
+                first, second = remaining
+                return lambda item: first(item) and second(item)
+            remaining = tuple(remaining)
+            def test_all(item):
+                for test in remaining:
+                    if not test(item):
+                        return False
+                return True
+            return test_all
+
+        return AdaptiveOrder(remaining, False).Evaluate
+
+
+    @classmethod
+    def Any(cls, tests):
+        """Combines `(cost, test)` pairs into a predicate that requires at least one test to pass"""
+        remaining = []
+        for cost, test in tests:
+            if test is cls.AlwaysTrue:
+                return cls.AlwaysTrue
+            if test is not cls.AlwaysFalse:
+                remaining.append((cost, test))
+
+        if not remaining:
+            return cls.AlwaysFalse
+        if len(remaining) == 1:
+            return remaining[0][1]
+        if cls.__isCheap(remaining):
+            remaining = [test for _, test in remaining]
+            if len(remaining) == 2:
+                first, second = remaining
+                return lambda item: first(item) or second(item)
+            remaining = tuple(remaining)
+            def test_any(item):
+                for test in remaining:
+                    if test(item):
+                        return True
+                return False
+            return test_any
+
+        return AdaptiveOrder(remaining, True).Evaluate
+
+
+    @staticmethod
+    def __isCheap(tests):
+        # Ordering comparisons isn't worth the bookkeeping
+        return all(cost == FilterCost.Compare for cost, _ in tests)
+
+
+class AdaptiveOrder:
+    """
+    Evaluates the children of an All/Any predicate, cheapest and most decisive first.
+    - Children are sorted by their static `FilterCost`, so a tooltip is only read when no cheaper sibling decided the result
+    - Within a cost class, children are periodically re-sorted by how often they decided the result
+    - All/Any are order independent, so reordering never changes the result
+    """
+    ReorderInterval = 64
+
+    def __init__(self, tests, decisive_result):
+        self.tests = sorted(tests, key=lambda pair: pair[0])  # Stable, keeps the written order within a cost
+        self.decisive_result = decisive_result  # `False` for All, `True` for Any
+        self.__resetCounts()
+
+
+    def Evaluate(self, item):
+        self.evaluations += 1
+        if self.evaluations == self.ReorderInterval:
+            self.Reorder()
+
+        decisive_result = self.decisive_result
+        for i, (_, test) in enumerate(self.tests):
+            if bool(test(item)) == decisive_result:
+                self.decided[i] += 1
+                return decisive_result
+
+        self.undecided += 1
+        return not decisive_result
+
+
+    def Reorder(self):
+        # A child at index `i` was reached by every evaluation decided at or after `i`
+        reached = self.undecided
+        rates = [0.0] * len(self.tests)
+        for i in range(len(self.tests) - 1, -1, -1):
+            reached += self.decided[i]
+            rates[i] = self.decided[i] / reached if reached else 0.0
+
+        order = sorted(range(len(self.tests)), key=lambda i: (self.tests[i][0], -rates[i]))
+        self.tests = [self.tests[i] for i in order]
+        self.__resetCounts()
+
+
+    def __resetCounts(self):
+        self.evaluations = 0
+        self.undecided = 0
+        self.decided = [0] * len(self.tests)
+
+
+class CompiledFilter:
+    """
+    - Evaluates a Filter through its compiled predicate
+        - `filter` - The resolved Filter to compile
+    """
+    def __init__(self, filter):
+        self.filter = filter
+        self.predicate = filter.Compile()
+
+
+    def Test(self, item):
+        return self.predicate(item)
+
+
+    def __str__(self):
+        return str(self.filter)
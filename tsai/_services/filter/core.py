@@ -1,8 +1,44 @@
+class FilterCost:
+    """Static cost class of a Filter. Cheaper Filters are evaluated first."""
+    Compare = 0  # Graphic, Serial or Hue comparison
+    Name = 1  # Reads and normalizes the item Name
+    Property = 2  # Reads the item tooltip
+
+
 class MultiFilterBase:
     def __init__(self, filters):
         self.filters = filters
 
 
+    def Flatten(self, keep=None):
+        """
+        Returns the child Filters, lifting the children of any nested Filter of the same type
+        - `keep` - Optional. Nested Filters that pass this predicate are not lifted
+        """
+        flattened = []
+        for filter in self.filters:
+            if type(filter) == type(self) and not (keep and keep(filter)):
+                flattened.extend(filter.Flatten(keep))
+            else:
+                flattened.append(filter)
+        return flattened
+
+
+    @property
+    def Cost(self):
+        return max([filter.Cost for filter in self.filters] or [FilterCost.Compare])
+
+
+    @property
+    def Deterministic(self):
+        return all(filter.Deterministic for filter in self.filters)
+
+
+    def Key(self):
+        """Structural identity. Children are unordered because All/Any don't depend on their order."""
+        return (type(self).__name__, frozenset(filter.Key() if filter != None else None for filter in self.filters))
+
+
     def __str__(self):
         return ", ".join(map(str, self.filters))
 
@@ -12,5 +48,19 @@ class MetaFilterBase:
         self.filter = filter
 
 
+    @property
+    def Cost(self):
+        return self.filter.Cost
+
+
+    @property
+    def Deterministic(self):
+        return self.filter.Deterministic
+
+
+    def Key(self):
+        return (type(self).__name__, self.filter.Key() if self.filter != None else None)
+
+
     def __str__(self):
         return str(self.filter)
\ No newline at end of file
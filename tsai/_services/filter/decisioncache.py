@@ -0,0 +1,58 @@
+from tsai._services.filter.core import FilterCost, MetaFilterBase, MultiFilterBase
+from tsai._services.filter.implementations import SerialFilter
+from tsai._services.filter.tooltipcache import TooltipCache
+
+
+class DecisionCache:
+    """
+    Remembers the first Organizer that passed an item, keyed by the item's fingerprint.
+    - The fingerprint is the Graphic, Hue, normalized Name and tooltip lines (Name and tooltip only when a Filter reads them)
+    - Identical items (ie. reagent stacks, potions) skip Filter evaluation entirely
+    - A `SerialFilter` fails every item but its own, so only the items with a referenced Serial bypass the cache
+    - Disabled when any other Filter is not decided by the fingerprint, ie. `PropertyValueFilter`
+    """
+    NoMatch = "NoMatch"
+
+    def __init__(self, organizers):
+        self.organizers = organizers
+        self.serials = set()
+        self.enabled = all(self.__isDeterministic(filter, self.serials) for organizer in organizers for filter in organizer.filters)
+        self.uses_name = any(FilterCost.Name <= organizer.Cost() for organizer in organizers)
+        self.uses_properties = any(FilterCost.Property <= organizer.Cost() for organizer in organizers)
+        self.decisions = {}
+
+
+    def GetFingerprint(self, item):
+        return (
+            item.Graphic,
+            item.Hue,
+            item.Name.lower() if self.uses_name else None,
+            TooltipCache.GetLines(item) if self.uses_properties else None,
+        )
+
+
+    def Get(self, item):
+        """Returns the first Organizer that passes the item, `NoMatch`, or `None` if the item wasn't seen before"""
+        if not self.enabled or item.Serial in self.serials:
+            return None
+
+        return self.decisions.get(self.GetFingerprint(item))
+
+
+    def Set(self, item, organizer):
+        """Records the first Organizer that passed the item, or `NoMatch`"""
+        if self.enabled and item.Serial not in self.serials:
+            self.decisions[self.GetFingerprint(item)] = organizer
+
+
+    @classmethod
+    def __isDeterministic(cls, filter, serials):
+        """Returns `True` if the Filter is decided by the fingerprint for every item whose Serial isn't collected in `serials`"""
+        if isinstance(filter, SerialFilter):
+            serials.add(filter.serial)
+            return True
+        if isinstance(filter, MultiFilterBase):
+            return all([cls.__isDeterministic(child, serials) for child in filter.filters])
+        if isinstance(filter, MetaFilterBase):
+            return cls.__isDeterministic(filter.filter, serials)
+        return filter == None or filter.Deterministic
@@ -0,0 +1,133 @@
+from bisect import bisect_right
+
+from tsai._services.filter.implementations import AllFilter, AnyFilter, SerialFilter, TypeFilter, TypeRangeFilter
+from tsai._services.filter.profiler import ProfiledFilter
+
+
+class DispatchKeys:
+    """
+    A necessary condition for a Filter to pass. The item must match at least one key.
+    - `types` - Set of Graphic IDs
+    - `serials` - Set of Serials
+    - `ranges` - List of inclusive `(type_start, type_end)` Graphic ranges
+    """
+    def __init__(self, types=None, serials=None, ranges=None):
+        self.types = types if types else set()
+        self.serials = serials if serials else set()
+        self.ranges = ranges if ranges else []
+
+
+    def Size(self):
+        return len(self.types) + len(self.serials) + len(self.ranges)
+
+
+    def Merge(self, other):
+        self.types |= other.types
+        self.serials |= other.serials
+        self.ranges.extend(other.ranges)
+
+
+class OrganizerIndex:
+    """
+    Maps an item's Graphic and Serial to the ordered list of Organizers that could pass it.
+    - Organizers whose Filters require an exact Graphic, Serial or Graphic range are only returned for those items
+    - Every other Organizer is always returned
+    - Candidates keep the Organizer order, so the first Organizer still wins
+    """
+    def __init__(self, organizers):
+        self.organizers = organizers
+        self.unkeyed = []
+        self.by_type = {}
+        self.by_serial = {}
+        self.range_bounds = []
+        self.range_indexes = []
+        self.__candidates_by_type = {}
+
+        ranges = []
+        for i, organizer in enumerate(organizers):
+            keys = self.GetKeys(AnyFilter(organizer.filters))
+            if keys == None:
+                self.unkeyed.append(i)
+                continue
+
+            for type_id in keys.types:
+                self.by_type.setdefault(type_id, []).append(i)
+            for serial in keys.serials:
+                self.by_serial.setdefault(serial, []).append(i)
+            for type_start, type_end in keys.ranges:
+                if type_start <= type_end:
+                    ranges.append((type_start, type_end, i))
+
+        self.__buildRanges(ranges)
+
+
+    def GetCandidates(self, item):
+        """Returns the Organizers, in order, that could pass the item"""
+        serial_indexes = self.by_serial.get(item.Serial)
+        if serial_indexes == None:
+            candidates = self.__candidates_by_type.get(item.Graphic)
+            if candidates == None:
+                candidates = self.__merge(self.__getTypeIndexes(item.Graphic))
+                self.__candidates_by_type[item.Graphic] = candidates
+            return candidates
+
+        return self.__merge(self.__getTypeIndexes(item.Graphic) + serial_indexes)
+
+
+    @classmethod
+    def GetKeys(cls, filter):
+        """Returns the `DispatchKeys` required by the Filter, or `None` if any item could pass it"""
+        if isinstance(filter, TypeFilter):
+            return DispatchKeys(types={filter.type_id})
+        if isinstance(filter, SerialFilter):
+            return DispatchKeys(serials={filter.serial})
+        if isinstance(filter, TypeRangeFilter):
+            return DispatchKeys(ranges=[(filter.type_start, filter.type_end)])
+        if isinstance(filter, ProfiledFilter):
+            return cls.GetKeys(filter.filter)
+
+        if isinstance(filter, AnyFilter):
+            keys = DispatchKeys()
+            for child in filter.filters:
+                child_keys = cls.GetKeys(child)
+                if child_keys == None:
+                    return None
+                keys.Merge(child_keys)
+            return keys
+
+        if isinstance(filter, AllFilter):
+            # Every child must pass, so the narrowest keyed child is enough
+            narrowest = None
+            for child in filter.filters:
+                child_keys = cls.GetKeys(child)
+                if child_keys != None and (narrowest == None or child_keys.Size() < narrowest.Size()):
+                    narrowest = child_keys
+            return narrowest
+
+        return None
+
+
+    def __getTypeIndexes(self, type_id):
+        indexes = self.by_type.get(type_id, [])
+        if self.range_bounds:
+            segment = bisect_right(self.range_bounds, type_id) - 1
+            if 0 <= segment:
+                indexes = indexes + self.range_indexes[segment]
+        return indexes
+
+
+    def __merge(self, indexes):
+        indexes = sorted(set(indexes).union(self.unkeyed))
+        return tuple(self.organizers[i] for i in indexes)
+
+
+    def __buildRanges(self, ranges):
+        # Split the ranges into non-overlapping segments, each holding every Organizer that covers it
+        bounds = set()
+        for type_start, type_end, _ in ranges:
+            bounds.add(type_start)
+            bounds.add(type_end + 1)
+
+        self.range_bounds = sorted(bounds)
+        for bound in self.range_bounds:
+            self.range_indexes.append([i for type_start, type_end, i in ranges if type_start <= bound <= type_end])
@@ -1,4 +1,7 @@
-from tsai._services.filter.core import MetaFilterBase, MultiFilterBase
+from tsai._services.filter.compiler import FilterCompiler
+from tsai._services.filter.core import FilterCost, MetaFilterBase, MultiFilterBase
+from tsai._services.filter.patternmatcher import PatternMatcher
+from tsai._services.filter.tooltipcache import TooltipCache
 class NameFilter:
     """
     - A case-insensitive partial string match against an item's `Name`
@@ -6,6 +9,9 @@ class NameFilter:
         - `hue` - Optional. If provided, the item must have this hue to pass the Filter
         - `partial_match` - Optional. If `False`, the item name must exactly match the provided value
     """
+    Cost = FilterCost.Name
+    Deterministic = True
+
     def __init__(self, name, hue=-1, partial_match=True):
         self.name = name
         self.name_normalized = name.lower()
@@ -26,6 +32,33 @@ class NameFilter:
         return item.Name.lower() == self.name_normalized
 
 
+    def Key(self):
+        return ("Name", self.name_normalized, self.hue, self.partial_match)
+
+
+    def Compile(self):
+        name_normalized = self.name_normalized
+        test = PatternMatcher.CompileName(name_normalized, self.partial_match)
+        if test is None:
+            if not self.partial_match:
+                test = lambda item: item.Name.lower() == name_normalized
+            elif name_normalized:
+                test = lambda item: name_normalized in item.Name.lower()
+            else:
+                test = FilterCompiler.AlwaysTrue  # Every name contains an empty string
+        return FilterCompiler.WithHue(self.hue, test)
+
+
+    def TestMany(self, columns, within=None):
+        if self.hue != -1:
+            within = columns.Restrict(columns.Equals(columns.hues, self.hue), within)
+        names = columns.names
+        name_normalized = self.name_normalized
+        if self.partial_match:
+            return columns.Where(lambda i: name_normalized in names[i], within)
+        return columns.Where(lambda i: names[i] == name_normalized, within)
+
+
     def __str__(self):
         name = "Partial Name" if self.partial_match else "Name"
         return "{} ({})".format(name, self.name_normalized)
@@ -36,19 +69,37 @@ class MaxPropertyCountFilter:
     - A count of the number of properties
         - `max_count` - The maximum number of properties an item can have
     """
+    Cost = FilterCost.Property
+    Deterministic = True
+
     def __init__(self, max_count):
         self.max_count = max_count
 
 
     def Test(self, item):
         # In Legion, we need to get the item properties and count them
-        name_and_props = API.ItemNameAndProps(item.Serial, False)
-        if not name_and_props:
+        lines = TooltipCache.GetLines(item)
+        if not lines:
             return True  # If we can't get props, allow it
-        lines = name_and_props.split('\n')
         return len(lines) - 1 <= self.max_count # Remove one for Name
 
 
+    def Key(self):
+        return ("MaxProps", self.max_count)
+
+
+    def Compile(self):
+        return self.Test
+
+
+    def TestMany(self, columns, within=None):
+        max_count = self.max_count
+        def test(i):
+            lines = columns.GetLines(i)
+            return not lines or len(lines) - 1 <= max_count
+        return columns.Where(test, within)
+
+
     def __str__(self):
         return "Max Props ({})".format(self.max_count)
 
@@ -60,6 +111,9 @@ class PropertyFilter:
         - `hue` - Optional. If provided, the item must have this hue to pass the Filter
         - `partial_match` - Optional. If `False`, the item property must exactly match the provided value
     """
+    Cost = FilterCost.Property
+    Deterministic = True
+
     def __init__(self, property, hue=-1, partial_match=True):
         self.property = property
         self.property_normalized = property.lower()
@@ -74,13 +128,36 @@ class PropertyFilter:
         return self.__hasProperty(item, self.property_normalized, self.partial_match)
 
 
-    def __hasProperty(self, item, value, partial_match):
-        name_and_props = API.ItemNameAndProps(item.Serial, False)
-        if not name_and_props:
-            return False
+    def Key(self):
+        return ("Prop", self.property_normalized, self.hue, self.partial_match)
+
+
+    def Compile(self):
+        value = self.property_normalized
+        get_properties = TooltipCache.GetProperties
+        test = PatternMatcher.CompileProperty(value, self.partial_match)
+        if test is None:
+            if self.partial_match:
+                def test(item):
+                    for property in get_properties(item):
+                        if value in property: return True
+                    return False
+            else:
+                test = lambda item: value in get_properties(item)
+        return FilterCompiler.WithHue(self.hue, test)
+
+
+    def TestMany(self, columns, within=None):
+        if self.hue != -1:
+            within = columns.Restrict(columns.Equals(columns.hues, self.hue), within)
+        value = self.property_normalized
+        if self.partial_match:
+            return columns.Where(lambda i: value in columns.GetPropertyText(i), within)
+        return columns.Where(lambda i: value in columns.GetProperties(i), within)
 
-        props = name_and_props.lower().split('\n')
-        for property in props[1:]: # Skip the Name line
+
+    def __hasProperty(self, item, value, partial_match):
+        for property in TooltipCache.GetProperties(item): # Skips the Name line
             if partial_match:
                 if value in property: return True
             else:
@@ -99,6 +176,9 @@ class PropertyValueFilter:
         - `property` - The exact name of the property
         - `value` - The numeric or string value to search for
     """
+    Cost = FilterCost.Compare
+    Deterministic = False  # Not decided by the item's fingerprint, see `DecisionCache`
+
     def __init__(self, property, value, case_insensitive=True):
         if case_insensitive:
             value = value.lower()
@@ -118,16 +198,107 @@ class PropertyValueFilter:
         return False
 
 
+    def Key(self):
+        return ("PropValue", self.property, self.value)
+
+
+    def Compile(self):
+        return self.Test
+
+
+    def TestMany(self, columns, within=None):
+        items = columns.items
+        return columns.Where(lambda i: self.Test(items[i]), within)
+
+
     def __str__(self):
         name = "#" if self.is_numeric else "Str"
         return "{} Prop Val ({})".format(name, self.property)
 
 
+class PropertyRangeFilter:
+    """
+    - Numeric comparison against a tooltip property, ie. "Luck 100" or "Lower Reagent Cost 20%"
+        - `property` - The case-insensitive name of the property, without the value
+        - `minimum` - Optional. The property value must be >= this value
+        - `maximum` - Optional. The property value must be <= this value
+    """
+    Cost = FilterCost.Property
+    Deterministic = True
+
+    def __init__(self, property, minimum=None, maximum=None):
+        self.property = property
+        self.property_normalized = property.lower().strip().rstrip(":").strip()
+        self.minimum = minimum
+        self.maximum = maximum
+
+
+    def Test(self, item):
+        return self.InRange(TooltipCache.GetPropertyValues(item).get(self.property_normalized))
+
+
+    def Key(self):
+        return ("PropRange", self.property_normalized, self.minimum, self.maximum)
+
+
+    def Compile(self):
+        property_normalized = self.property_normalized
+        get_values = TooltipCache.GetPropertyValues
+        in_range = self.InRange
+        return lambda item: in_range(get_values(item).get(property_normalized))
+
+
+    def TestMany(self, columns, within=None):
+        property_normalized = self.property_normalized
+        return columns.Where(lambda i: self.InRange(columns.GetPropertyValues(i).get(property_normalized)), within)
+
+
+    def InRange(self, property_value):
+        if property_value == None:
+            return False
+        if self.minimum != None and property_value.value < self.minimum:
+            return False
+        if self.maximum != None and self.maximum < property_value.value:
+            return False
+        return True
+
+
+    def __str__(self):
+        if self.maximum == None:
+            return "Prop ({} >= {})".format(self.property_normalized, self.minimum)
+        if self.minimum == None:
+            return "Prop ({} <= {})".format(self.property_normalized, self.maximum)
+        return "Prop ({} {} to {})".format(self.property_normalized, self.minimum, self.maximum)
+
+
+class PropertyMinFilter(PropertyRangeFilter):
+    """
+    - The tooltip property value must be >= the provided value, ie. `PropertyMinFilter("Luck", 100)`
+        - `property` - The case-insensitive name of the property, without the value
+        - `minimum` - The smallest value allowed
+    """
+    def __init__(self, property, minimum):
+        PropertyRangeFilter.__init__(self, property, minimum=minimum)
+
+
+class PropertyMaxFilter(PropertyRangeFilter):
+    """
+    - The tooltip property value must be <= the provided value, ie. `PropertyMaxFilter("Weight", 10)`
+        - `property` - The case-insensitive name of the property, without the value
+        - `maximum` - The largest value allowed
+    """
+    def __init__(self, property, maximum):
+        PropertyRangeFilter.__init__(self, property, maximum=maximum)
+
+
 class SerialFilter:
     """
     - Exact match against an item's `Serial`
         - `serial` - The ID to search for
     """
+    Cost = FilterCost.Compare
+    Deterministic = False  # Not decided by the item's fingerprint, see `DecisionCache`
+
     def __init__(self, serial):
         self.serial = serial
 
@@ -136,6 +307,19 @@ class SerialFilter:
         return item.Serial == self.serial
 
 
+    def Key(self):
+        return ("Serial", self.serial)
+
+
+    def Compile(self):
+        serial = self.serial
+        return lambda item: item.Serial == serial
+
+
+    def TestMany(self, columns, within=None):
+        return columns.Restrict(columns.Equals(columns.serials, self.serial), within)
+
+
     def __str__(self):
         return "Serial ({})".format(self.serial)
 
@@ -146,6 +330,9 @@ class TypeFilter:
         - `type_id` - The item must have this Graphic or ID
         - `hue` - Optional. If provided, the item must have this hue to pass the Filter
     """
+    Cost = FilterCost.Compare
+    Deterministic = True
+
     def __init__(self, type_id, hue=-1):
         self.type_id = type_id
         self.hue = hue
@@ -155,6 +342,22 @@ class TypeFilter:
         return (self.hue == -1 or self.hue == item.Hue) and item.Graphic == self.type_id
 
 
+    def Key(self):
+        return ("Type", self.type_id, self.hue)
+
+
+    def Compile(self):
+        type_id = self.type_id
+        return FilterCompiler.WithHue(self.hue, lambda item: item.Graphic == type_id)
+
+
+    def TestMany(self, columns, within=None):
+        mask = columns.Equals(columns.graphics, self.type_id)
+        if self.hue != -1:
+            mask = columns.And(mask, columns.Equals(columns.hues, self.hue))
+        return columns.Restrict(mask, within)
+
+
     def __str__(self):
         return "Type ({})".format(hex(self.type_id))
 
@@ -165,6 +368,9 @@ class TypeRangeFilter:
         - `type_start` - The starting graphic ID
         - `type_end` - The ending graphic ID
     """
+    Cost = FilterCost.Compare
+    Deterministic = True
+
     def __init__(self, type_start, type_end):
         self.type_start = type_start
         self.type_end = type_end
@@ -174,6 +380,22 @@ class TypeRangeFilter:
         return self.type_start <= item.Graphic and item.Graphic <= self.type_end
 
 
+    def Key(self):
+        return ("TypeRange", self.type_start, self.type_end)
+
+
+    def Compile(self):
+        type_start = self.type_start
+        type_end = self.type_end
+        if type_end < type_start:
+            return FilterCompiler.AlwaysFalse
+        return lambda item: type_start <= item.Graphic <= type_end
+
+
+    def TestMany(self, columns, within=None):
+        return columns.Restrict(columns.InRange(columns.graphics, self.type_start, self.type_end), within)
+
+
     def __str__(self):
         return "Type Range ({} to {})".format(hex(self.type_start), hex(self.type_end))
 
@@ -191,6 +413,17 @@ class NotFilter(MetaFilterBase):
         return not self.filter.Test(item)
 
 
+    def Compile(self):
+        if isinstance(self.filter, NotFilter):
+            return FilterCompiler.CompileShared(self.filter.filter)  # Double negation
+        return FilterCompiler.Not(FilterCompiler.CompileShared(self.filter))
+
+
+    def TestMany(self, columns, within=None):
+        within = columns.Within(within)
+        return columns.And(within, columns.Not(self.filter.TestMany(columns, within)))
+
+
     def __str__(self):
         return "Not: {}".format(self.filter)
 
@@ -211,6 +444,20 @@ class AllFilter(MultiFilterBase):  # AND
         return True
 
 
+    def Compile(self):
+        return FilterCompiler.All([(filter.Cost, FilterCompiler.CompileShared(filter)) for filter in self.Flatten(FilterCompiler.IsShared)])
+
+
+    def TestMany(self, columns, within=None):
+        # Cheap Filters narrow down the items that the expensive Filters have to read
+        mask = columns.Within(within)
+        for filter in sorted(self.Flatten(), key=lambda filter: filter.Cost):
+            if columns.IsEmpty(mask):
+                break
+            mask = columns.And(mask, filter.TestMany(columns, mask))
+        return mask
+
+
 class AnyFilter(MultiFilterBase):  # OR
     """
     - At least one Filter must pass in order for the item to be moved
@@ -224,4 +471,44 @@ class AnyFilter(MultiFilterBase):  # OR
         for filter in self.filters:
             if filter.Test(item):
                 return True
-        return False
\ No newline at end of file
+        return False
+
+
+    def Compile(self):
+        # Exact Graphic/Serial checks are merged into a single set lookup
+        type_ids = set()
+        serials = set()
+        tests = []
+        for filter in self.Flatten(FilterCompiler.IsShared):
+            if isinstance(filter, TypeFilter) and filter.hue == -1:
+                type_ids.add(filter.type_id)
+            elif isinstance(filter, SerialFilter):
+                serials.add(filter.serial)
+            else:
+                tests.append((filter.Cost, FilterCompiler.CompileShared(filter)))
+
+        if len(type_ids) == 1:
+            tests.insert(0, (FilterCost.Compare, TypeFilter(type_ids.pop()).Compile()))
+        elif type_ids:
+            type_ids = frozenset(type_ids)
+            tests.insert(0, (FilterCost.Compare, lambda item: item.Graphic in type_ids))
+        if len(serials) == 1:
+            tests.insert(0, (FilterCost.Compare, SerialFilter(serials.pop()).Compile()))
+        elif serials:
+            serials = frozenset(serials)
+            tests.insert(0, (FilterCost.Compare, lambda item: item.Serial in serials))
+
+        return FilterCompiler.Any(tests)
+
+
+    def TestMany(self, columns, within=None):
+        # Items that already passed are not tested by the remaining Filters
+        remaining = columns.Within(within)
+        mask = columns.Nothing()
+        for filter in sorted(self.Flatten(), key=lambda filter: filter.Cost):
+            if columns.IsEmpty(remaining):
+                break
+            passed = columns.And(remaining, filter.TestMany(columns, remaining))
+            mask = columns.Or(mask, passed)
+            remaining = columns.And(remaining, columns.Not(passed))
+        return mask
@@ -0,0 +1,126 @@
+import re
+
+from tsai._services.filter.tooltipcache import TooltipCache
+
+
+class MultiPatternSearch:
+    """
+    Finds every pattern contained in a text with one regular expression, an alternation tried at every position.
+    - Slower than testing each pattern with `in` on CPython and IronPython, see `tests/benchmark_filters.py`
+    - At each position, the longest pattern that starts there is matched
+    - Every shorter pattern starting at the same position is one of its prefixes, so it is implied by that match
+    """
+    def __init__(self, patterns):
+        self.patterns = frozenset(pattern for pattern in patterns if pattern)
+        ordered = sorted(self.patterns, key=len, reverse=True)
+        self.__expression = re.compile("(?=({}))".format("|".join(map(re.escape, ordered))))
+        self.__implied = {}
+        for pattern in ordered:
+            self.__implied[pattern] = frozenset(other for other in self.patterns if pattern.startswith(other))
+
+
+    def Search(self, text):
+        """Returns the set of patterns found in the `text`"""
+        found = set()
+        for match in self.__expression.finditer(text):
+            longest = match.group(1)
+            if longest not in found:
+                found |= self.__implied[longest]
+        return frozenset(found)
+
+
+class PatternMatcher:
+    """
+    Shared matcher for the `NameFilter` and `PropertyFilter` strings of every Organizer and ignored Filter.
+    - Each item's Name and Properties are scanned once per run and the matched strings are cached
+    - Filters compiled after `Build` test membership in the matched set instead of scanning
+    - Only built when `SystemConfig.SharePatternScans` is enabled, otherwise compiled Filters scan directly
+    """
+    MinimumPatterns = 2  # A single pattern is cheaper to search for directly
+
+    _name_search = None
+    _property_search = None
+    _exact_properties = frozenset()
+    _name_matches = {}
+    _property_matches = {}
+    _property_lines = {}
+
+
+    @classmethod
+    def Build(cls, name_patterns, property_patterns, exact_property_patterns=()):
+        cls.Clear()
+        name_patterns = set(name_patterns)
+        property_patterns = set(property_patterns)
+        cls._name_search = MultiPatternSearch(name_patterns) if cls.MinimumPatterns <= len(name_patterns) else None
+        cls._property_search = MultiPatternSearch(property_patterns) if cls.MinimumPatterns <= len(property_patterns) else None
+        cls._exact_properties = frozenset(exact_property_patterns) if cls.MinimumPatterns <= len(set(exact_property_patterns)) else frozenset()
+
+
+    @classmethod
+    def CompileName(cls, value, partial_match=True):
+        """Returns a predicate backed by the shared matcher, or `None` if the value was not registered"""
+        if not partial_match or cls._name_search == None or value not in cls._name_search.patterns:
+            return None
+
+        get_matches = cls.GetNameMatches
+        return lambda item: value in get_matches(item)
+
+
+    @classmethod
+    def CompileProperty(cls, value, partial_match=True):
+        """Returns a predicate backed by the shared matcher, or `None` if the value was not registered"""
+        if not partial_match:
+            if value not in cls._exact_properties:
+                return None
+            get_lines = cls.GetPropertyLines
+            return lambda item: value in get_lines(item)
+
+        if cls._property_search == None or value not in cls._property_search.patterns:
+            return None
+
+        get_matches = cls.GetPropertyMatches
+        return lambda item: value in get_matches(item)
+
+
+    @classmethod
+    def GetNameMatches(cls, item):
+        name = item.Name.lower()
+        entry = cls._name_matches.get(item.Serial)
+        if entry != None and entry[0] == name:
+            return entry[1]
+
+        matches = cls._name_search.Search(name)
+        cls._name_matches[item.Serial] = (name, matches)
+        return matches
+
+
+    @classmethod
+    def GetPropertyMatches(cls, item):
+        lines = TooltipCache.GetProperties(item)
+        entry = cls._property_matches.get(item.Serial)
+        if entry != None and entry[0] is lines:
+            return entry[1]
+
+        # Patterns never contain a line break, so a match can't span two properties
+        matches = cls._property_search.Search("\n".join(lines))
+        cls._property_matches[item.Serial] = (lines, matches)
+        return matches
+
+
+    @classmethod
+    def GetPropertyLines(cls, item):
+        lines = TooltipCache.GetProperties(item)
+        entry = cls._property_lines.get(item.Serial)
+        if entry != None and entry[0] is lines:
+            return entry[1]
+
+        line_set = frozenset(lines)
+        cls._property_lines[item.Serial] = (lines, line_set)
+        return line_set
+
+
+    @classmethod
+    def Clear(cls):
+        cls._name_matches.clear()
+        cls._property_matches.clear()
+        cls._property_lines.clear()
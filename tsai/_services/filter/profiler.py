@@ -0,0 +1,130 @@
+import json
+import time
+
+from tsai._services.filter.compiler import FilterCompiler
+from tsai._services.filter.core import MetaFilterBase, MultiFilterBase
+from tsai._services.filter.tooltipcache import TooltipCache
+
+
+class ProfiledFilter(MetaFilterBase):
+    """
+    - Records the call count, pass count, cumulative time and tooltip fetches of the provided Filter
+        - `filter` - A single Filter to measure
+        - `label` - The name used in the report
+    """
+    def __init__(self, filter, label):
+        MetaFilterBase.__init__(self, filter)
+        self.label = label
+        self.calls = 0
+        self.passes = 0
+        self.seconds = 0.0
+        self.fetches = 0
+
+
+    def Test(self, item):
+        return self.__measure(self.filter.Test, item)
+
+
+    def Compile(self):
+        test = FilterCompiler.CompileShared(self.filter)
+        return lambda item: self.__measure(test, item)
+
+
+    def TestMany(self, columns, within=None):
+        fetches = TooltipCache.Fetches
+        start = time.perf_counter()
+        mask = self.filter.TestMany(columns, within)
+        self.seconds += time.perf_counter() - start
+        self.fetches += TooltipCache.Fetches - fetches
+        self.calls += len(columns.Indexes(columns.Within(within)))
+        self.passes += len(columns.Indexes(mask))
+        return mask
+
+
+    def __measure(self, test, item):
+        fetches = TooltipCache.Fetches
+        start = time.perf_counter()
+        result = test(item)
+        self.seconds += time.perf_counter() - start
+        self.fetches += TooltipCache.Fetches - fetches
+        self.calls += 1
+        if result:
+            self.passes += 1
+        return result
+
+
+    def __str__(self):
+        return str(self.filter)
+
+
+class FilterProfiler:
+    """
+    Opt-in profiling of resolved Filter trees, see `SystemConfig.ProfileFilters`.
+    - `Wrap` replaces every node with a `ProfiledFilter`. Nothing is wrapped, and nothing is measured, unless it is called.
+    - Times are inclusive of the node's children
+    """
+    _profiled = {}
+
+
+    @classmethod
+    def Wrap(cls, filters, label):
+        """Wraps the resolved Filters in place. Shared nodes are wrapped once."""
+        for i, filter in enumerate(filters):
+            filters[i] = cls.__wrap(filter, label)
+
+
+    @classmethod
+    def GetProfiled(cls):
+        """Returns the profiled nodes, most expensive first"""
+        return sorted(cls._profiled.values(), key=lambda profiled: profiled.seconds, reverse=True)
+
+
+    @classmethod
+    def Report(cls, limit=20, json_path=None):
+        profiled = [node for node in cls.GetProfiled() if node.calls]
+        print("Filter profile ({} nodes, ranked by cumulative time)".format(len(profiled)))
+        for node in profiled[:limit]:
+            print("{:9.3f}s  calls {:6}  passed {:6}  fetches {:6}  {}".format(node.seconds, node.calls, node.passes, node.fetches, node.label))
+
+        if json_path:
+            with open(json_path, "w") as file:
+                json.dump([{
+                    "label": node.label,
+                    "seconds": node.seconds,
+                    "calls": node.calls,
+                    "passes": node.passes,
+                    "fetches": node.fetches,
+                } for node in profiled], file, indent=2)
+
+
+    @classmethod
+    def Clear(cls):
+        cls._profiled.clear()
+
+
+    @classmethod
+    def __wrap(cls, filter, label):
+        if filter == None or isinstance(filter, ProfiledFilter):
+            return filter
+        if filter in cls._profiled:
+            return cls._profiled[filter]
+
+        node_label = "{} > {}".format(label, cls.__describe(filter))
+        if isinstance(filter, MultiFilterBase):
+            for i, child in enumerate(filter.filters):
+                filter.filters[i] = cls.__wrap(child, node_label)
+        elif isinstance(filter, MetaFilterBase):
+            filter.filter = cls.__wrap(filter.filter, node_label)
+
+        profiled = ProfiledFilter(filter, node_label)
+        cls._profiled[filter] = profiled
+        return profiled
+
+
+    @staticmethod
+    def __describe(filter):
+        if isinstance(filter, MultiFilterBase):
+            return type(filter).__name__.replace("Filter", "")
+        if isinstance(filter, MetaFilterBase):
+            return type(filter).__name__.replace("Filter", "")
+        return str(filter)
@@ -0,0 +1,166 @@
+from tsai._services.filter.core import MetaFilterBase
+from tsai._services.filter.implementations import AllFilter, AnyFilter, NameFilter, NotFilter, PropertyFilter, PropertyRangeFilter, TypeFilter, TypeRangeFilter
+
+
+class ShadowAnalysis:
+    """
+    Static check of resolved Filters for rules that can never decide an item.
+    - `Implies` only answers `True` when it is provable, anything it can't reason about is kept
+    - A child of an Any that is implied by a sibling is redundant, as is a child of an All that a sibling implies
+    - A Filter of an Organizer is unreachable when an ignored Filter or an earlier Organizer already takes every item it passes
+    """
+
+    @classmethod
+    def Implies(cls, filter, other):
+        """Returns `True` if every item that passes `filter` provably passes `other`"""
+        if filter == None or other == None:
+            return False
+        if filter is other or filter.Key() == other.Key():
+            return True
+
+        if isinstance(filter, AnyFilter):
+            return all(cls.Implies(child, other) for child in filter.filters)
+        if isinstance(other, AllFilter):
+            return all(cls.Implies(filter, child) for child in other.filters)
+        if isinstance(other, AnyFilter) and any(cls.Implies(filter, child) for child in other.filters):
+            return True
+        if isinstance(filter, AllFilter):
+            return any(cls.Implies(child, other) for child in filter.filters)
+        if isinstance(other, AnyFilter):
+            return False
+
+        if isinstance(filter, NotFilter) and isinstance(other, NotFilter):
+            return cls.Implies(other.filter, filter.filter)
+        if isinstance(filter, MetaFilterBase) or isinstance(other, MetaFilterBase):
+            return False
+
+        return cls.__impliesLeaf(filter, other)
+
+
+    @classmethod
+    def Simplify(cls, filter, removed):
+        """
+        Returns the Filter without its redundant children. The Filter is returned as is when nothing was removed.
+        - `removed` - Receives a `(removed_filter, covering_filter)` pair for every child that was dropped
+        """
+        if isinstance(filter, NotFilter):
+            child = cls.Simplify(filter.filter, removed)
+            return filter if child is filter.filter else NotFilter(child)
+        if not isinstance(filter, (AnyFilter, AllFilter)):
+            return filter
+
+        children = [cls.Simplify(child, removed) for child in filter.filters]
+        if isinstance(filter, AnyFilter):
+            kept = cls.__dropCovered(children, removed, cls.Implies)
+        else:
+            kept = cls.__dropCovered(children, removed, lambda child, sibling: cls.Implies(sibling, child))
+
+        if len(kept) == len(filter.filters) and all(a is b for a, b in zip(kept, filter.filters)):
+            return filter
+        return type(filter)(kept)
+
+
+    @classmethod
+    def PruneOrganizers(cls, organizers, ignored_filters=None):
+        """
+        Drops redundant and unreachable Filters, then every Organizer left without a Filter.
+        Returns the remaining Organizers and a list of warnings.
+        - An earlier Organizer only shadows a later one with the same Source that sends items to the same or fewer Destinations,
+          otherwise items fall through to the later Organizer once the earlier Destinations are full
+        """
+        warnings = []
+        kept = []
+        for i, organizer in enumerate(organizers):
+            shadows = list(ignored_filters or [])
+            for earlier in kept:
+                if earlier.source == organizer.source and cls.__coversDestinations(earlier.destination, organizer.destination):
+                    shadows.extend(earlier.filters)
+
+            removed = []
+            filters = [cls.Simplify(filter, removed) for filter in organizer.filters]
+            filters = cls.__dropCovered(filters, removed, cls.Implies)
+            reachable = []
+            for filter in filters:
+                shadow = next((shadow for shadow in shadows if cls.Implies(filter, shadow)), None)
+                if shadow == None:
+                    reachable.append(filter)
+                else:
+                    removed.append((filter, shadow))
+
+            for filter, shadow in removed:
+                warnings.append("Organizer {}: skipped '{}', it is covered by '{}'".format(i + 1, filter, shadow))
+
+            if removed and not reachable:
+                warnings.append("Organizer {} is never reached and was skipped".format(i + 1))
+                continue
+
+            organizer.filters = reachable if removed else organizer.filters
+            kept.append(organizer)
+
+        return kept, warnings
+
+
+    @classmethod
+    def __dropCovered(cls, filters, removed, is_covered):
+        # Equivalent Filters keep the first one
+        kept = []
+        for filter in filters:
+            cover = next((other for other in kept if is_covered(filter, other)), None)
+            if cover != None:
+                removed.append((filter, cover))
+                continue
+
+            for other in [other for other in kept if is_covered(other, filter)]:
+                kept.remove(other)
+                removed.append((other, filter))
+            kept.append(filter)
+        return kept
+
+
+    @classmethod
+    def __coversDestinations(cls, destination, other):
+        destinations = destination if isinstance(destination, list) else [destination]
+        others = other if isinstance(other, list) else [other]
+        return all(serial in destinations for serial in others)
+
+
+    @classmethod
+    def __impliesLeaf(cls, filter, other):
+        if isinstance(other, TypeFilter):
+            return isinstance(filter, TypeFilter) and filter.type_id == other.type_id and cls.__impliesHue(filter.hue, other.hue)
+        if isinstance(other, TypeRangeFilter):
+            if isinstance(filter, TypeFilter):
+                return other.type_start <= filter.type_id <= other.type_end
+            if isinstance(filter, TypeRangeFilter):
+                # An empty range passes nothing
+                return filter.type_end < filter.type_start or (other.type_start <= filter.type_start and filter.type_end <= other.type_end)
+            return False
+
+        if isinstance(other, NameFilter):
+            return isinstance(filter, NameFilter) \
+                and cls.__impliesHue(filter.hue, other.hue) \
+                and cls.__impliesText(filter.name_normalized, filter.partial_match, other.name_normalized, other.partial_match)
+        if isinstance(other, PropertyFilter):
+            return isinstance(filter, PropertyFilter) \
+                and cls.__impliesHue(filter.hue, other.hue) \
+                and cls.__impliesText(filter.property_normalized, filter.partial_match, other.property_normalized, other.partial_match)
+        if isinstance(other, PropertyRangeFilter):
+            return isinstance(filter, PropertyRangeFilter) \
+                and filter.property_normalized == other.property_normalized \
+                and (other.minimum == None or (filter.minimum != None and other.minimum <= filter.minimum)) \
+                and (other.maximum == None or (filter.maximum != None and filter.maximum <= other.maximum))
+
+        return False
+
+
+    @classmethod
+    def __impliesHue(cls, hue, other_hue):
+        return other_hue == -1 or hue == other_hue
+
+
+    @classmethod
+    def __impliesText(cls, value, partial_match, other_value, other_partial_match):
+        # The text that passes `value` contains it, so it contains every part of it as well
+        if other_partial_match:
+            return other_value in value
+        return not partial_match and value == other_value
@@ -1,3 +1,16 @@
 class SystemConfig:
     LogFilterSummary = False
-    AndOperatorCharacter = "&"
\ No newline at end of file
+    AndOperatorCharacter = "&"
+    CompileFilters = True  # Evaluate each Organizer through a single compiled predicate instead of the Filter tree
+    SharePatternScans = False  # Test compiled Name/Property Filters against one shared scan of each item's text (`PatternMatcher`). Slower than direct scans in `tests/benchmark_filters.py`
+    BatchFilters = False  # Classify each Source container in one columnar pass (`TestMany`), NumPy is used when available
+    ProfileFilters = False  # Measure every Filter node and print a ranked report when the script completes
+    ProfileReportPath = None  # Optional. File path to also write the profile report as JSON
+    CacheUnmatchedItems = True  # Remember items that passed no Organizer and skip them on the next run, until the configuration changes
+    PipelineMoves = True  # Queue several moves at once (`API.QueueMoveItem`) and confirm each by its Container, instead of pausing after every move
+    LookAheadContainers = True  # Open the next child container while the items of the current one are processed
+    SnapshotSources = True  # Remember containers whose items passed no Organizer and skip them on the next run while their contents are unchanged
+    PrefetchTooltips = True  # Wait for the tooltips of a whole container before filtering it, items whose tooltip never arrives are left for the next run
+    CheckpointInterval = 25  # Save the progress every N moves, so an interrupted run resumes where it stopped. 0 to disable
+    InventoryDatabasePath = None  # Optional. SQLite file that every container read is recorded in, requires `sqlite3`
+    PruneShadowedFilters = True  # Skip Filters and Organizers that an earlier Organizer or an ignored Filter provably always takes first, a warning is printed for each
@@ -0,0 +1,98 @@
+# import API
+
+from tsai._services.filter.tooltipparser import TooltipParser
+
+class TooltipCache:
+    """
+    Per-run cache of an item's `Name` and `Property` lines.
+    - Lines are fetched once per serial, lowercased, split and stored as an immutable tuple
+    - An entry is refreshed when the item's Graphic, Hue or Amount changes
+    - `GetPropertyValues` parses the Property lines once per item into `{property: PropertyValue}`
+    - `Prefetch` waits for the tooltips of many items at once, so the latency is paid once per container
+    - Call `Invalidate` after changing an item (ie. dropping into a container) and `Clear` when the run ends
+    """
+    Fetches = 0  # Number of tooltips requested from the client
+    PollSeconds = 0.05
+    MaximumPollSeconds = 0.25
+    _entries = {}
+    _values = {}
+
+
+    @classmethod
+    def GetLines(cls, item):
+        """Returns the normalized lines (Name first) or an empty tuple if the tooltip is not available yet"""
+        version = (item.Graphic, item.Hue, item.Amount)
+        entry = cls._entries.get(item.Serial)
+        if entry != None and entry[0] == version:
+            return entry[1]
+
+        cls.Fetches += 1
+        name_and_props = API.ItemNameAndProps(item.Serial, False)
+        if not name_and_props:
+            return ()  # Don't cache, the tooltip may still be loading
+
+        lines = tuple(name_and_props.lower().split('\n'))
+        cls._entries[item.Serial] = (version, lines, lines[1:])
+        return lines
+
+
+    @classmethod
+    def GetCachedLines(cls, item):
+        """Returns the normalized lines if they were already fetched, otherwise `None`. The client is not asked."""
+        entry = cls._entries.get(item.Serial)
+        if entry == None or entry[0] != (item.Graphic, item.Hue, item.Amount):
+            return None
+        return entry[1]
+
+
+    @classmethod
+    def GetProperties(cls, item):
+        """Returns the normalized Property lines, skipping the Name line"""
+        entry = cls._entries.get(item.Serial)
+        if entry == None or entry[0] != (item.Graphic, item.Hue, item.Amount):
+            if not cls.GetLines(item):
+                return ()
+            entry = cls._entries[item.Serial]
+        return entry[2]
+
+
+    @classmethod
+    def GetPropertyValues(cls, item):
+        """Returns the numeric Property values, ie. `{"luck": PropertyValue(100)}`"""
+        properties = cls.GetProperties(item)
+        entry = cls._values.get(item.Serial)
+        if entry != None and entry[0] is properties:
+            return entry[1]
+
+        values = TooltipParser.Parse(properties)
+        cls._values[item.Serial] = (properties, values)
+        return values
+
+
+    @classmethod
+    def Prefetch(cls, items, timeout=3.0):
+        """
+        Requests the tooltip of every item and waits until each one arrived or the item is gone.
+        Returns the items whose tooltip is still missing after `timeout` seconds.
+        """
+        pending = [item for item in items if not cls.GetLines(item)]
+        delay = cls.PollSeconds
+        waited = 0.0
+        while pending and waited < timeout:
+            API.Pause(delay)
+            waited += delay
+            delay = min(delay * 2, cls.MaximumPollSeconds)
+            pending = [item for item in pending if API.FindItem(item.Serial) != None and not cls.GetLines(item)]
+        return pending
+
+
+    @classmethod
+    def Invalidate(cls, serial):
+        cls._entries.pop(serial, None)
+        cls._values.pop(serial, None)
+
+
+    @classmethod
+    def Clear(cls):
+        cls._entries.clear()
+        cls._values.clear()
@@ -0,0 +1,58 @@
+import re
+
+
+class PropertyValue:
+    """
+    Numeric value parsed from a single tooltip line
+    - `value` - The first number on the line (ie. `20` for "lower reagent cost 20%")
+    - `maximum` - The second number of "x/y" forms (ie. `125` for "contents: 10/125 items"), otherwise `None`
+    - `is_percent` - `True` if the value was followed by `%`
+    """
+    def __init__(self, value, maximum=None, is_percent=False):
+        self.value = value
+        self.maximum = maximum
+        self.is_percent = is_percent
+
+
+    def __str__(self):
+        value = "{}%".format(self.value) if self.is_percent else str(self.value)
+        return value if self.maximum == None else "{}/{}".format(value, self.maximum)
+
+
+class TooltipParser:
+    """
+    Parses normalized Property lines into a `{property: PropertyValue}` mapping.
+    - "luck 100", "weight: 5 stones", "lower reagent cost 20%", "contents: 10/125 items", "durability 50 / 255"
+    - Lines without a number are skipped. If a property is repeated, the first line wins.
+    """
+    _pattern = re.compile(
+        r"^(?P<name>[a-z][a-z '\-]*?)\s*:?\s*"
+        r"(?P<sign>[+-])?(?P<value>\d[\d,]*(?:\.\d+)?)\s*(?P<percent>%)?"
+        r"(?:\s*/\s*(?P<maximum>\d[\d,]*(?:\.\d+)?))?"
+    )
+
+
+    @classmethod
+    def Parse(cls, lines):
+        values = {}
+        for line in lines:
+            match = cls._pattern.match(line.strip())
+            if match == None:
+                continue
+
+            name = match.group("name").strip()
+            if name in values:
+                continue
+
+            value = cls.ParseNumber(match.group("value"))
+            if match.group("sign") == "-":
+                value = -value
+            maximum = match.group("maximum")
+            values[name] = PropertyValue(value, cls.ParseNumber(maximum) if maximum else None, match.group("percent") != None)
+        return values
+
+
+    @staticmethod
+    def ParseNumber(text):
+        text = text.replace(",", "")
+        return float(text) if "." in text else int(text)
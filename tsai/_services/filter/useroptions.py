@@ -1,4 +1,9 @@
 class UserOptions:
     Open_Child_Containers = True  # If you want to open the child containers when searching Source containers
     Move_To_Destination = True  # If you want your character to move within 2 tiles of the Destination containers
-    Output_Item_Move_Messages = True  # If you want to see what item is moved and the destination that it is moved to
\ No newline at end of file
+    Output_Item_Move_Messages = False  # If you want to see what item is moved and the destination that it is moved to
+    Plan_Moves = True  # If you want every item classified first, then each Destination visited once along a short route
+    Dry_Run = False  # If you want to print the move plan and its estimated time without moving anything
+    Full_Scan = False  # If you want to evaluate every item again, instead of only the items that are new or changed since the last run
+    Show_Progress = True  # If you want a window with the scanned, matched and moved counts instead of a message per item
+    Time_Budget_Seconds = None  # If you want the run to stop after this many seconds. Moves are then always planned (see `Plan_Moves`), the most valuable are made first and the rest wait for the next run
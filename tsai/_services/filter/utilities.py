@@ -1,6 +1,13 @@
+import hashlib
+import re
+
+from tsai._services.filter.compiler import FilterCompiler
 from tsai._services.filter.core import MetaFilterBase, MultiFilterBase
-from tsai._services.filter.implementations import AnyFilter, AllFilter, NameFilter, PropertyFilter, SerialFilter, TypeFilter
+from tsai._services.filter.implementations import AnyFilter, AllFilter, NameFilter, PropertyFilter, PropertyMaxFilter, PropertyMinFilter, SerialFilter, TypeFilter
+from tsai._services.filter.patternmatcher import PatternMatcher
 class FilterUtils:
+    ComparisonPattern = re.compile(r"^(?P<property>.+?)\s*(?P<operator>>=|<=)\s*(?P<value>-?\d+(?:\.\d+)?)\s*%?$")
+
     @classmethod
     def ConvertShorthand(cls, value, and_operator):
         if not isinstance(value, str) and not isinstance(value, int):
@@ -12,16 +19,91 @@ class FilterUtils:
 
 
     @classmethod
-    def ResolveFilters(cls, filters, and_operator=None):
+    def ResolveFilters(cls, filters, and_operator=None, interned=None):
+        """
+        Converts any shorthand in place
+        - `interned` - Optional. Shared between calls, structurally identical Filters are replaced by a single instance
+        """
         for i, filter in enumerate(filters):
             if isinstance(filter, MultiFilterBase):
-                cls.ResolveFilters(filter.filters, and_operator)
+                cls.ResolveFilters(filter.filters, and_operator, interned)
             elif isinstance(filter, MetaFilterBase):
                 temp = [filter.filter]
-                cls.ResolveFilters(temp, and_operator)
+                cls.ResolveFilters(temp, and_operator, interned)
                 filter.filter = temp[0]
             else:
                 filters[i] = cls.ConvertShorthand(filter, and_operator)
+                if interned != None and filters[i] is not filter and filters[i] != None:
+                    # Shorthand creates a new tree, resolve it so its children are interned as well
+                    temp = [filters[i]]
+                    cls.ResolveFilters(temp, and_operator, interned)
+                    filters[i] = temp[0]
+                    continue
+
+            if interned != None and filters[i] != None:
+                filters[i] = cls.__Intern(filters[i], interned)
+
+
+    @classmethod
+    def Compile(cls, filters):
+        """Compiles a list of resolved Filters into a single predicate that passes if any Filter passes"""
+        return AnyFilter(filters).Compile()
+
+
+    @classmethod
+    def __Intern(cls, filter, interned):
+        key = filter.Key()
+        shared = interned.get(key)
+        if shared == None:
+            interned[key] = filter
+            return filter
+
+        FilterCompiler.Share(shared)
+        return shared
+
+
+    @classmethod
+    def GetConfigHash(cls, keys):
+        """Returns a stable hash of the provided `Key()` values. It doesn't change between sessions."""
+        return hashlib.sha1(cls.__Canonical(keys).encode("utf-8")).hexdigest()
+
+
+    @classmethod
+    def __Canonical(cls, value):
+        # Sets are sorted and numbers are written the same way on every run, unlike `hash()`
+        if isinstance(value, (tuple, list)):
+            return "(" + ",".join(map(cls.__Canonical, value)) + ")"
+        if isinstance(value, (set, frozenset)):
+            return "{" + ",".join(sorted(map(cls.__Canonical, value))) + "}"
+        if isinstance(value, str):
+            return repr(value)
+        return str(value)
+
+
+    @classmethod
+    def BuildPatternMatcher(cls, filters):
+        """Registers the strings of every resolved Name/Property Filter with the shared `PatternMatcher`"""
+        name_patterns = set()
+        property_patterns = set()
+        exact_property_patterns = set()
+        cls.__CollectPatterns(filters, name_patterns, property_patterns, exact_property_patterns)
+        PatternMatcher.Build(name_patterns, property_patterns, exact_property_patterns)
+
+
+    @classmethod
+    def __CollectPatterns(cls, filters, name_patterns, property_patterns, exact_property_patterns):
+        for filter in filters:
+            if isinstance(filter, MultiFilterBase):
+                cls.__CollectPatterns(filter.filters, name_patterns, property_patterns, exact_property_patterns)
+            elif isinstance(filter, MetaFilterBase):
+                cls.__CollectPatterns([filter.filter], name_patterns, property_patterns, exact_property_patterns)
+            elif isinstance(filter, NameFilter) and filter.partial_match:
+                name_patterns.add(filter.name_normalized)
+            elif isinstance(filter, PropertyFilter):
+                if filter.partial_match:
+                    property_patterns.add(filter.property_normalized)
+                else:
+                    exact_property_patterns.add(filter.property_normalized)
 
 
     @classmethod
@@ -61,5 +143,18 @@ class FilterUtils:
         if isinstance(value, int):
             return AnyFilter([SerialFilter(value), TypeFilter(value)])
         if isinstance(value, str):
+            comparison = cls.ComparisonPattern.match(value.strip())
+            if comparison:
+                return cls.__CreateComparisonFilter(comparison)
             return AnyFilter([NameFilter(value), PropertyFilter(value)])
-        return None
\ No newline at end of file
+        return None
+
+
+    @classmethod
+    def __CreateComparisonFilter(cls, comparison):
+        # ie. "Luck >= 100" or "Lower Reagent Cost <= 20%"
+        value = comparison.group("value")
+        value = float(value) if "." in value else int(value)
+        if comparison.group("operator") == ">=":
+            return PropertyMinFilter(comparison.group("property"), value)
+        return PropertyMaxFilter(comparison.group("property"), value)
@@ -0,0 +1,173 @@
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None  # Legion's IronPython doesn't ship SQLite, the index is disabled without it
+
+import time
+
+from tsai._services.inventory.search import TextDocument, TextIndex
+
+
+class InventoryIndex:
+    """
+    Local SQLite database of every container read and the items found inside.
+    - `containers` - Serial, parent container, Graphic, Hue, Name, fingerprint and last seen time
+    - `items` - Serial, container, Graphic, Hue, Amount, Name, tooltip lines and last seen time
+    - Reading a container replaces its items, so an item is only ever listed in the container it was last seen in
+    - `Search` runs the Filter shorthand against a `TextIndex` built from the stored items, no container is opened
+    """
+    _schema = """
+        CREATE TABLE IF NOT EXISTS containers (
+            serial INTEGER PRIMARY KEY,
+            parent INTEGER,
+            graphic INTEGER,
+            hue INTEGER,
+            name TEXT,
+            fingerprint TEXT,
+            last_seen REAL
+        );
+        CREATE TABLE IF NOT EXISTS items (
+            serial INTEGER PRIMARY KEY,
+            container INTEGER,
+            graphic INTEGER,
+            hue INTEGER,
+            amount INTEGER,
+            name TEXT,
+            tooltip TEXT,
+            last_seen REAL
+        );
+        CREATE INDEX IF NOT EXISTS items_container ON items (container);
+        CREATE INDEX IF NOT EXISTS items_graphic ON items (graphic);
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(self._schema)
+        self.text_index = None  # Built on the first search
+
+
+    @staticmethod
+    def IsAvailable():
+        return sqlite3 != None
+
+
+    def UpsertContainer(self, container, items, get_lines, fingerprint=None):
+        """
+        Records the container and replaces the items listed inside it.
+        - `container` - The container item
+        - `items` - Every item found directly inside
+        - `get_lines` - Returns an item's normalized tooltip lines
+        """
+        now = time.time()
+        rows = [(int(item.Serial), int(container.Serial), item.Graphic, item.Hue, item.Amount, item.Name.lower(), "\n".join(get_lines(item)[1:]), now) for item in items]
+        with self.connection:
+            if self.text_index != None:
+                for (serial,) in self.connection.execute("SELECT serial FROM items WHERE container = ?", (int(container.Serial),)).fetchall():
+                    self.text_index.Remove(serial)
+                for row in rows:
+                    self.text_index.Add(self.__toDocument(row))
+
+            self.connection.execute(
+                "INSERT OR REPLACE INTO containers VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (int(container.Serial), int(container.Container or 0), container.Graphic, container.Hue, container.Name.lower(), fingerprint, now))
+            self.connection.execute("DELETE FROM items WHERE container = ?", (int(container.Serial),))
+            self.connection.executemany("INSERT OR REPLACE INTO items VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+    def RecordMove(self, serial, container):
+        """Updates the container of a moved item without reading the destination"""
+        with self.connection:
+            self.connection.execute("UPDATE items SET container = ?, last_seen = ? WHERE serial = ?", (int(container), time.time(), int(serial)))
+        if self.text_index != None and int(serial) in self.text_index.documents:
+            self.text_index.documents[int(serial)].Container = int(container)
+
+
+    def Touch(self, serial):
+        """Marks a container, and the items inside it, as seen without reading it"""
+        now = time.time()
+        with self.connection:
+            self.connection.execute("UPDATE containers SET last_seen = ? WHERE serial = ?", (now, int(serial)))
+            self.connection.execute("UPDATE items SET last_seen = ? WHERE container = ?", (now, int(serial)))
+
+
+    def IsStale(self, serial, fingerprint=None, max_age=None):
+        """Returns `True` if the container was never read, its fingerprint changed or it was last seen more than `max_age` seconds ago"""
+        row = self.connection.execute("SELECT fingerprint, last_seen FROM containers WHERE serial = ?", (int(serial),)).fetchone()
+        if row == None:
+            return True
+        if fingerprint != None and row[0] != fingerprint:
+            return True
+        return max_age != None and max_age < time.time() - row[1]
+
+
+    def FindItems(self, name=None, graphic=None, hue=None, property=None):
+        """Returns `(serial, container, graphic, hue, amount, name)` rows. `name` and `property` are partial, case insensitive matches."""
+        query, parameters = self.__where(name, graphic, hue, property)
+        return self.connection.execute("SELECT serial, container, graphic, hue, amount, name FROM items" + query, parameters).fetchall()
+
+
+    def Search(self, value, and_operator="&"):
+        """
+        Returns the `(serial, container, graphic, hue, amount, name)` of the items that pass the Filter.
+        - `value` - Shorthand (ie. "wand & unidentified", 0x1f03) or a resolved Filter
+        """
+        if self.text_index == None:
+            self.text_index = TextIndex()
+            for row in self.connection.execute("SELECT serial, container, graphic, hue, amount, name, tooltip, last_seen FROM items"):
+                self.text_index.Add(self.__toDocument(row))
+
+        if isinstance(value, (str, int)):
+            serials = self.text_index.Query(value, and_operator)
+        else:
+            serials = self.text_index.Search(value)
+
+        documents = [self.text_index.documents[serial] for serial in sorted(serials)]
+        return [(document.Serial, document.Container, document.Graphic, document.Hue, document.Amount, document.Name) for document in documents]
+
+
+    def Count(self, name=None, graphic=None, hue=None, property=None):
+        """Returns the total Amount of the matching items"""
+        query, parameters = self.__where(name, graphic, hue, property)
+        return self.connection.execute("SELECT COALESCE(SUM(amount), 0) FROM items" + query, parameters).fetchone()[0]
+
+
+    def GetPath(self, serial):
+        """Returns the serials of the containers holding the item, innermost first"""
+        path = []
+        row = self.connection.execute("SELECT container FROM items WHERE serial = ?", (int(serial),)).fetchone()
+        parent = row[0] if row != None else None
+        while parent and parent not in path:
+            path.append(parent)
+            row = self.connection.execute("SELECT parent FROM containers WHERE serial = ?", (parent,)).fetchone()
+            parent = row[0] if row != None else None
+        return path
+
+
+    def Close(self):
+        self.connection.close()
+
+
+    @staticmethod
+    def __toDocument(row):
+        serial, container, graphic, hue, amount, name, tooltip, _ = row
+        return TextDocument(serial, container, graphic, hue, amount, name, tooltip.split("\n") if tooltip else ())
+
+
+    @staticmethod
+    def __where(name, graphic, hue, property):
+        conditions = []
+        parameters = []
+        if name != None:
+            conditions.append("instr(name, ?) > 0")
+            parameters.append(name.lower())
+        if graphic != None:
+            conditions.append("graphic = ?")
+            parameters.append(graphic)
+        if hue != None:
+            conditions.append("hue = ?")
+            parameters.append(hue)
+        if property != None:
+            conditions.append("instr(tooltip, ?) > 0")
+            parameters.append(property.lower())
+        return (" WHERE " + " AND ".join(conditions) if conditions else ""), parameters
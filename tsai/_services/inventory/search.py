@@ -0,0 +1,176 @@
+import re
+
+from tsai._services.filter.core import MetaFilterBase
+from tsai._services.filter.implementations import AllFilter, AnyFilter, MaxPropertyCountFilter, NameFilter, NotFilter, PropertyFilter, PropertyRangeFilter, PropertyValueFilter, SerialFilter, TypeFilter, TypeRangeFilter
+from tsai._services.filter.tooltipparser import TooltipParser
+from tsai._services.filter.utilities import FilterUtils
+
+
+class TextDocument:
+    """Stored copy of an item, with the same attribute names as a live item"""
+    def __init__(self, serial, container, graphic, hue, amount, name, lines):
+        self.Serial = serial
+        self.Container = container
+        self.Graphic = graphic
+        self.Hue = hue
+        self.Amount = amount
+        self.Name = name
+        self.lines = tuple(lines)
+        self.__values = None
+
+
+    def GetPropertyValues(self):
+        if self.__values == None:
+            self.__values = TooltipParser.Parse(self.lines)
+        return self.__values
+
+
+class TextIndex:
+    """
+    Inverted index over the normalized Name and Property lines of stored items.
+    - Tokens answer partial matches that stay within a word by scanning the vocabulary instead of every item
+    - Trigrams narrow down every other partial match, the few candidates left are verified
+    - `Search` evaluates a resolved Filter tree, `Query` runs the Filter shorthand (ie. "wand & unidentified")
+    """
+    _token = re.compile(r"[a-z0-9]+")
+    _token_only = re.compile(r"^[a-z0-9]+$")
+
+    def __init__(self):
+        self.documents = {}
+        self.__by_graphic = {}
+        self.__name_tokens = {}
+        self.__name_trigrams = {}
+        self.__property_tokens = {}
+        self.__property_trigrams = {}
+
+
+    def Add(self, document):
+        self.Remove(document.Serial)
+        self.documents[document.Serial] = document
+        self.__by_graphic.setdefault(document.Graphic, set()).add(document.Serial)
+        self.__post(self.__name_tokens, self.__name_trigrams, document.Serial, [document.Name])
+        self.__post(self.__property_tokens, self.__property_trigrams, document.Serial, document.lines)
+
+
+    def Remove(self, serial):
+        document = self.documents.pop(serial, None)
+        if document == None:
+            return
+
+        self.__by_graphic[document.Graphic].discard(serial)
+        self.__unpost(self.__name_tokens, self.__name_trigrams, serial, [document.Name])
+        self.__unpost(self.__property_tokens, self.__property_trigrams, serial, document.lines)
+
+
+    def Query(self, value, and_operator="&"):
+        """Returns the serials of the items that pass the shorthand `value`"""
+        return self.Search(FilterUtils.ConvertShorthand(value, and_operator))
+
+
+    def Search(self, filter):
+        """Returns the serials of the items that pass the resolved Filter"""
+        if filter == None:
+            return set()
+
+        if isinstance(filter, AnyFilter):
+            found = set()
+            for child in filter.filters:
+                found |= self.Search(child)
+            return found
+        if isinstance(filter, AllFilter):
+            found = None
+            for child in filter.filters:
+                found = self.Search(child) if found == None else found & self.Search(child)
+                if not found:
+                    break
+            return set(self.documents) if found == None else found
+        if isinstance(filter, NotFilter):
+            return set(self.documents) - self.Search(filter.filter)
+        if isinstance(filter, MetaFilterBase):
+            return self.Search(filter.filter)
+
+        if isinstance(filter, SerialFilter):
+            return {filter.serial} if filter.serial in self.documents else set()
+        if isinstance(filter, TypeFilter):
+            return self.__withHue(self.__by_graphic.get(filter.type_id, ()), filter.hue)
+        if isinstance(filter, TypeRangeFilter):
+            found = set()
+            for graphic, serials in self.__by_graphic.items():
+                if filter.type_start <= graphic <= filter.type_end:
+                    found |= serials
+            return found
+
+        if isinstance(filter, NameFilter):
+            return self.__withHue(self.__searchNames(filter.name_normalized, filter.partial_match), filter.hue)
+        if isinstance(filter, PropertyFilter):
+            return self.__withHue(self.__searchProperties(filter.property_normalized, filter.partial_match), filter.hue)
+        if isinstance(filter, PropertyRangeFilter):
+            # The property name has to be in the tooltip for a value to be parsed
+            candidates = self.__searchProperties(filter.property_normalized, True)
+            return set(serial for serial in candidates if filter.InRange(self.documents[serial].GetPropertyValues().get(filter.property_normalized)))
+        if isinstance(filter, MaxPropertyCountFilter):
+            return set(serial for serial, document in self.documents.items() if len(document.lines) <= filter.max_count)
+        if isinstance(filter, PropertyValueFilter):
+            return set(serial for serial, document in self.documents.items() if filter.Test(document))
+
+        raise ValueError("Filter is not supported by the index ({})".format(type(filter).__name__))
+
+
+    def __searchNames(self, value, partial_match):
+        candidates = self.__candidates(self.__name_tokens, self.__name_trigrams, value)
+        if not partial_match:
+            return set(serial for serial in candidates if self.documents[serial].Name == value)
+        if self._token_only.match(value):
+            return candidates  # Already exact
+        return set(serial for serial in candidates if value in self.documents[serial].Name)
+
+
+    def __searchProperties(self, value, partial_match):
+        candidates = self.__candidates(self.__property_tokens, self.__property_trigrams, value)
+        if not partial_match:
+            return set(serial for serial in candidates if value in self.documents[serial].lines)
+        if self._token_only.match(value):
+            return candidates
+        return set(serial for serial in candidates if any(value in line for line in self.documents[serial].lines))
+
+
+    def __candidates(self, tokens, trigrams, value):
+        """Returns a superset of the items containing `value`, or exactly those items if `value` is a single word"""
+        if self._token_only.match(value):
+            found = set()
+            for token, serials in tokens.items():
+                if value in token:
+                    found |= serials
+            return found
+
+        found = None
+        for i in range(len(value) - 2):
+            serials = trigrams.get(value[i:i + 3], set())
+            found = set(serials) if found == None else found & serials
+            if not found:
+                return set()
+        return set(self.documents) if found == None else found
+
+
+    def __withHue(self, serials, hue):
+        if hue == -1:
+            return set(serials)
+        return set(serial for serial in serials if self.documents[serial].Hue == hue)
+
+
+    @classmethod
+    def __post(cls, tokens, trigrams, serial, texts):
+        for text in texts:
+            for token in cls._token.findall(text):
+                tokens.setdefault(token, set()).add(serial)
+            for i in range(len(text) - 2):
+                trigrams.setdefault(text[i:i + 3], set()).add(serial)
+
+
+    @classmethod
+    def __unpost(cls, tokens, trigrams, serial, texts):
+        for text in texts:
+            for token in cls._token.findall(text):
+                tokens.get(token, set()).discard(serial)
+            for i in range(len(text) - 2):
+                trigrams.get(text[i:i + 3], set()).discard(serial)
@@ -0,0 +1,104 @@
+import re
+
+from tsai._services.filter.tooltipcache import TooltipCache
+
+
+class ContainerCapacity:
+    """
+    Known fill level of a single container. Any limit may be `None` if the tooltip doesn't show it.
+    - `count` / `maximum` - Items, from "contents: 10/125 items"
+    - `weight` / `maximum_weight` - Stones, from "contents: 10/125 items, 45/400 stones"
+    """
+    def __init__(self, count=0, maximum=None, weight=0, maximum_weight=None):
+        self.count = count
+        self.maximum = maximum
+        self.weight = weight
+        self.maximum_weight = maximum_weight
+
+
+class CapacityLedger:
+    """
+    Per-run record of each Destination's capacity.
+    - A container's tooltip is read once, every item assigned to it afterwards is counted locally
+    - Call `Add` as soon as an item is assigned, so planned moves can't over-stuff a container
+    """
+    _stones = re.compile(r"(\d[\d,]*)(?:\s*/\s*(\d[\d,]*))?\s*stones")
+
+    def __init__(self, reserved_space=5):
+        self.reserved_space = reserved_space
+        self.__containers = {}
+
+
+    def HasCapacity(self, serial, item=None):
+        capacity = self.__get(serial)
+        if capacity == None:
+            return False
+
+        count, weight = self.GetSize(item)
+        if capacity.maximum != None and capacity.maximum - self.reserved_space < capacity.count + count:
+            return False
+        if capacity.maximum_weight != None and capacity.maximum_weight < capacity.weight + weight:
+            return False
+        return True
+
+
+    def Add(self, serial, item):
+        capacity = self.__get(serial)
+        if capacity == None:
+            return
+
+        count, weight = self.GetSize(item)
+        capacity.count += count
+        capacity.weight += weight
+
+
+    @staticmethod
+    def GetSize(item):
+        """Returns the `(count, weight)` an item adds to a container, including anything inside it"""
+        if item == None:
+            return 1, 0
+
+        values = TooltipCache.GetPropertyValues(item)
+        contents = values.get("contents")
+        weight = values.get("weight")
+        return 1 + (contents.value if contents != None else 0), weight.value if weight != None else 0
+
+
+    def Clear(self):
+        self.__containers.clear()
+
+
+    def __get(self, serial):
+        if serial in self.__containers:
+            return self.__containers[serial]
+
+        item = API.FindItem(serial)
+        if item == None:
+            return None
+
+        capacity = self.__read(item)
+        if TooltipCache.GetLines(item):  # Otherwise read it again once the tooltip has loaded
+            self.__containers[serial] = capacity
+        return capacity
+
+
+    def __read(self, item):
+        # Look for "Contents: X/Y items", assume it has capacity if we can't check
+        capacity = ContainerCapacity()
+        for line in TooltipCache.GetProperties(item):
+            if not line.startswith("contents"):
+                continue
+
+            contents = TooltipCache.GetPropertyValues(item).get("contents")
+            if contents != None and contents.maximum != None:
+                capacity.count = contents.value
+                capacity.maximum = contents.maximum
+
+            stones = self._stones.search(line)
+            if stones != None:
+                capacity.weight = int(stones.group(1).replace(",", ""))
+                if stones.group(2):
+                    capacity.maximum_weight = int(stones.group(2).replace(",", ""))
+            break
+
+        return capacity
@@ -0,0 +1,83 @@
+# import API
+
+from tsai._utils.alias import AliasUtils
+
+
+class RunCheckpoint:
+    """
+    Persisted, per character, progress of an interrupted run.
+    - `finished` - Sources that were completely processed
+    - `entries` - The planned `[serial, destination, organizer_index]` moves of the current Source
+    - Completed moves are saved every `interval` moves, entries are only used when the configuration hash matches
+    """
+    Alias = "$yao_checkpoint"
+
+    def __init__(self, config_hash, scope, interval=25):
+        self.config_hash = config_hash
+        self.scope = scope
+        self.interval = interval
+        self.finished = []
+        self.source = None
+        self.entries = []
+        self.completed = set()
+        self.__unsaved = 0
+        self.__load()
+
+
+    def IsFinished(self, source_serial):
+        return int(source_serial) in self.finished
+
+
+    def GetEntries(self, source_serial):
+        """Returns the planned moves of the Source that were not completed, or `None` if it wasn't planned"""
+        if self.source != int(source_serial):
+            return None
+        return [entry for entry in self.entries if entry[0] not in self.completed]
+
+
+    def Begin(self, source_serial, entries):
+        self.source = int(source_serial)
+        self.entries = [[int(serial), int(destination), organizer_index] for serial, destination, organizer_index in entries]
+        self.completed = set()
+        self.Save()
+
+
+    def Complete(self, serial):
+        self.completed.add(int(serial))
+        self.__unsaved += 1
+        if self.interval <= self.__unsaved:
+            self.Save()
+
+
+    def FinishSource(self, source_serial):
+        self.finished.append(int(source_serial))
+        self.source = None
+        self.entries = []
+        self.completed = set()
+        self.Save()
+
+
+    def Save(self):
+        self.__unsaved = 0
+        AliasUtils.save_json(self.Alias, self.scope, {
+            "finished": self.finished,
+            "source": self.source,
+            "entries": self.entries,
+            "completed": sorted(self.completed),
+        }, self.config_hash)
+
+
+    def Clear(self):
+        """Call once the run completed"""
+        API.SavePersistentVar(self.Alias, "", self.scope)
+
+
+    def __load(self):
+        data = AliasUtils.get_json(self.Alias, self.scope, self.config_hash)
+        if data == None:
+            return
+
+        self.finished = data.get("finished", [])
+        self.source = data.get("source")
+        self.entries = data.get("entries", [])
+        self.completed = set(data.get("completed", []))
@@ -0,0 +1,68 @@
+from tsai._data.containers import ContainerGraphics
+from tsai._services.filter.tooltipcache import TooltipCache
+from tsai._utils.alias import AliasUtils
+
+
+class ContainerRegistry:
+    """
+    Decides whether an item is a container without reading its tooltip when possible.
+    - Graphics in `ContainerGraphics.Known` are containers, unless an already loaded tooltip says otherwise
+    - Containers found by their tooltip ("contents:") are learned by Serial and Graphic, other Graphics are learned as plain items
+    - `Load` and `Save` persist what was learned between runs
+    """
+    Alias = "$yao_containers"
+
+    _container_serials = set()
+    _container_graphics = set()
+    _item_graphics = set()
+
+
+    @classmethod
+    def IsContainer(cls, item):
+        if int(item.Serial) in cls._container_serials:
+            return True
+        if item.Graphic in cls._item_graphics:
+            return False
+
+        lines = TooltipCache.GetCachedLines(item)
+        if lines == None:
+            if item.Graphic in ContainerGraphics.Known or item.Graphic in cls._container_graphics:
+                return True
+            lines = TooltipCache.GetLines(item)
+        if not lines:
+            return False  # Not loaded, don't learn anything
+
+        is_container = any("contents:" in line for line in lines[1:])
+        if is_container:
+            cls._container_serials.add(int(item.Serial))
+            cls._container_graphics.add(item.Graphic)
+        elif item.Graphic not in ContainerGraphics.Known and item.Graphic not in cls._container_graphics:
+            cls._item_graphics.add(item.Graphic)
+        return is_container
+
+
+    @classmethod
+    def Load(cls, scope):
+        data = AliasUtils.get_json(cls.Alias, scope)
+        if data == None:
+            return
+
+        cls._container_serials = set(data.get("serials", []))
+        cls._container_graphics = set(data.get("container_graphics", []))
+        cls._item_graphics = set(data.get("item_graphics", [])) - cls._container_graphics
+
+
+    @classmethod
+    def Save(cls, scope):
+        AliasUtils.save_json(cls.Alias, scope, {
+            "serials": sorted(int(serial) for serial in cls._container_serials),
+            "container_graphics": sorted(int(graphic) for graphic in cls._container_graphics),
+            "item_graphics": sorted(int(graphic) for graphic in cls._item_graphics),
+        })
+
+
+    @classmethod
+    def Clear(cls):
+        cls._container_serials.clear()
+        cls._container_graphics.clear()
+        cls._item_graphics.clear()
@@ -0,0 +1,100 @@
+# import API
+
+from tsai._services.filter.tooltipcache import TooltipCache
+
+
+class ContainerTracker:
+    """
+    Per-run record of the containers whose contents were loaded by the client.
+    - A fresh open polls the contents with a short backoff instead of sleeping for a fixed time
+    - Contents are loaded once the item count reaches the tooltip's "contents: X/Y items", or stops changing
+    - Reopening a loaded container returns immediately
+    - `Request` opens a container without waiting, so its contents load in the background
+    - `IsLoaded` tells a container whose contents arrived from one that timed out
+    """
+    PollSeconds = 0.1
+    MaximumPollSeconds = 0.4
+    Timeout = 2.0
+
+    _loaded = set()
+    _requested = set()
+    _timed_out = set()
+
+
+    @classmethod
+    def Open(cls, serial):
+        """Opens the container unless it is already loaded. Returns `False` if its contents didn't arrive in time."""
+        if serial in cls._loaded:
+            return serial not in cls._timed_out
+
+        if serial in cls._requested:
+            cls._requested.discard(serial)
+            if cls.WaitForContents(serial):
+                return True
+            cls._loaded.discard(serial)  # The early open may have been refused, try once more
+
+        API.UseObject(serial)
+        return cls.WaitForContents(serial)
+
+
+    @classmethod
+    def Request(cls, serial):
+        if serial in cls._loaded or serial in cls._requested:
+            return
+
+        API.UseObject(serial)
+        cls._requested.add(serial)
+
+
+    @classmethod
+    def IsLoaded(cls, serial):
+        """Returns `True` if the contents of the container arrived"""
+        return serial in cls._loaded and serial not in cls._timed_out
+
+
+    @classmethod
+    def WaitForContents(cls, serial, timeout=None):
+        expected = cls.__getExpectedCount(serial)
+        if expected == 0:
+            cls._loaded.add(serial)
+            cls._timed_out.discard(serial)
+            return True
+
+        timeout = cls.Timeout if timeout == None else timeout
+        delay = cls.PollSeconds
+        waited = 0.0
+        previous = None
+        while waited < timeout:
+            API.Pause(delay)
+            waited += delay
+            count = len(API.ItemsInContainer(serial, False))
+            # Nested items are part of the tooltip count, so a stable count also means loaded
+            if 0 < count and (count == previous or (expected != None and expected <= count)):
+                cls._loaded.add(serial)
+                cls._timed_out.discard(serial)
+                return True
+
+            previous = count
+            delay = min(delay * 2, cls.MaximumPollSeconds)
+
+        # Don't wait for an empty container again
+        cls._loaded.add(serial)
+        cls._timed_out.add(serial)
+        return False
+
+
+    @classmethod
+    def Clear(cls):
+        cls._loaded.clear()
+        cls._requested.clear()
+        cls._timed_out.clear()
+
+
+    @staticmethod
+    def __getExpectedCount(serial):
+        item = API.FindItem(serial)
+        if item == None:
+            return None
+
+        contents = TooltipCache.GetPropertyValues(item).get("contents")
+        return contents.value if contents != None else None
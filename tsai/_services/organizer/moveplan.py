@@ -0,0 +1,91 @@
+from tsai._services.organizer.route import RoutePlanner
+
+
+class MoveEntry:
+    """A single item that an Organizer will move"""
+    def __init__(self, item, organizer, destination):
+        self.item = item
+        self.organizer = organizer
+        self.destination = destination
+
+
+class MoveStop:
+    """
+    Every item moved to a single Destination
+    - `position` - The `(x, y)` to travel to, or `None` if no travel is required (ie. the backpack)
+    """
+    def __init__(self, destination, position):
+        self.destination = destination
+        self.position = position
+        self.entries = []
+
+
+class MovePlan:
+    """
+    Moves grouped by Destination, so each Destination is visited once.
+    - `OrderRoute` sorts the stops into a short route from the player's position
+    """
+    SecondsPerTile = 0.2  # Estimated running speed while pathfinding
+    SecondsPerMove = 1.0  # Estimated delay between two item moves
+
+    def __init__(self):
+        self.stops = []
+        self.__stops_by_destination = {}
+
+
+    def Add(self, item, organizer, destination, position=None):
+        stop = self.__stops_by_destination.get(destination)
+        if stop == None:
+            stop = MoveStop(destination, position)
+            self.__stops_by_destination[destination] = stop
+            self.stops.append(stop)
+        stop.entries.append(MoveEntry(item, organizer, destination))
+
+
+    def Count(self):
+        return sum(len(stop.entries) for stop in self.stops)
+
+
+    def OrderRoute(self, start):
+        """Stops that don't require travel come first, the rest follow the shortest route found"""
+        stationary = [stop for stop in self.stops if stop.position == None]
+        travelling = [stop for stop in self.stops if stop.position != None]
+        order = RoutePlanner.Order(start, [stop.position for stop in travelling])
+        self.stops = stationary + [travelling[i] for i in order]
+
+
+    def OrderByPriority(self, get_priority):
+        """
+        Makes the most important moves first. The route is followed once per priority, visiting only the stops with moves of that priority.
+        - `get_priority` - Returns a sortable key for an Organizer, lowest first
+        """
+        stops = []
+        for priority in sorted(set(get_priority(entry.organizer) for stop in self.stops for entry in stop.entries)):
+            for stop in self.stops:
+                entries = [entry for entry in stop.entries if get_priority(entry.organizer) == priority]
+                if entries:
+                    ordered = MoveStop(stop.destination, stop.position)
+                    ordered.entries = entries
+                    stops.append(ordered)
+        self.stops = stops
+
+
+    def GetTravelDistance(self, start):
+        positions = [stop.position for stop in self.stops if stop.position != None]
+        return RoutePlanner.GetLength(start, positions, range(len(positions)))
+
+
+    def EstimateSeconds(self, start):
+        return self.GetTravelDistance(start) * self.SecondsPerTile + self.Count() * self.SecondsPerMove
+
+
+    def Describe(self, start):
+        """Returns the lines of a dry run summary"""
+        lines = ["Move plan: {} items, {} destinations, {} tiles, ~{}s".format(
+            self.Count(), len(self.stops), self.GetTravelDistance(start), int(self.EstimateSeconds(start)))]
+        for i, stop in enumerate(self.stops):
+            destination = hex(stop.destination) if isinstance(stop.destination, int) else stop.destination
+            lines.append("{}. {} ({} items)".format(i + 1, destination, len(stop.entries)))
+            for entry in stop.entries:
+                lines.append("    {} ({})".format(entry.item.Name, hex(entry.item.Serial)))
+        return lines
@@ -0,0 +1,95 @@
+# import API
+
+import time
+
+from tsai._services.filter.tooltipcache import TooltipCache
+
+
+class PendingMove:
+    def __init__(self, serial, destination, amount):
+        self.serial = serial
+        self.destination = destination
+        self.amount = amount
+        self.attempts = 0
+        self.queued_at = 0.0
+
+
+class MoveQueue:
+    """
+    Bounded window of moves queued with `API.QueueMoveItem`.
+    - A move is confirmed once the item's Container is the Destination (or the item merged into a stack and is gone)
+    - Moves that aren't confirmed within the timeout are queued again, up to `max_attempts`
+    - The window grows by one after each confirmation and is halved after each timeout, so it settles at what the server's drag delay allows
+    """
+    MinimumWindow = 1
+    PollSeconds = 0.05
+
+    def __init__(self, maximum_window=8, timeout=3.0, max_attempts=3):
+        self.maximum_window = maximum_window
+        self.timeout = timeout
+        self.max_attempts = max_attempts
+        self.window = self.MinimumWindow
+        self.pending = []
+        self.moved = 0
+        self.failed = []
+        self.delay = None  # Moving average of the confirmation delay, in seconds
+        self.started_at = None
+
+
+    def Enqueue(self, serial, destination, amount=0):
+        while self.window <= len(self.pending):
+            self.__wait()
+
+        if self.started_at == None:
+            self.started_at = time.perf_counter()
+        self.__send(PendingMove(serial, destination, amount))
+
+
+    def Flush(self):
+        """Waits until every queued move is confirmed or has failed"""
+        while self.pending:
+            self.__wait()
+
+
+    def GetItemsPerMinute(self):
+        if self.started_at == None or self.moved == 0:
+            return 0.0
+        elapsed = time.perf_counter() - self.started_at
+        return self.moved * 60 / elapsed if 0 < elapsed else 0.0
+
+
+    def __send(self, move):
+        move.attempts += 1
+        move.queued_at = time.perf_counter()
+        API.QueueMoveItem(move.serial, move.destination, move.amount)
+        self.pending.append(move)
+
+
+    def __wait(self):
+        API.Pause(self.PollSeconds)
+        now = time.perf_counter()
+        for move in list(self.pending):
+            item = API.FindItem(move.serial)
+            if item == None or item.Container == move.destination:
+                self.pending.remove(move)
+                self.__confirm(move, now - move.queued_at)
+            elif self.__getTimeout() < now - move.queued_at:
+                self.pending.remove(move)
+                self.window = max(self.MinimumWindow, self.window // 2)
+                if move.attempts < self.max_attempts:
+                    self.__send(move)
+                else:
+                    self.failed.append(move)
+                    API.SysMsg("Failed to move ({}) to ({}).".format(hex(move.serial), hex(move.destination)))
+
+
+    def __getTimeout(self):
+        # A slow shard shouldn't turn every move into a retry
+        return self.timeout if self.delay == None else max(self.timeout, self.delay * 4)
+
+
+    def __confirm(self, move, delay):
+        self.moved += 1
+        self.delay = delay if self.delay == None else (self.delay * 3 + delay) / 4
+        self.window = min(self.maximum_window, self.window + 1)
+        TooltipCache.Invalidate(move.serial)
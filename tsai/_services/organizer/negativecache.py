@@ -0,0 +1,62 @@
+from tsai._utils.alias import AliasUtils
+
+
+class NegativeMatchCache:
+    """
+    Persisted, per character and per Source, set of items that passed no Organizer.
+    - Entries are only used when the configuration hash matches, so editing the Organizers or ignored Filters invalidates it
+    - The fingerprint doesn't require a tooltip, so cached items are skipped before any tooltip is fetched
+    - Each entry remembers its container. Entries of a container that was read are only kept if they were seen again,
+      so items that left it are dropped. Entries of a container that wasn't read (ie. skipped by `SourceSnapshot`) are kept.
+    """
+    AliasPrefix = "$yao_no_match_"
+
+    def __init__(self, source_serial, config_hash, scope):
+        self.alias = "{}{}".format(self.AliasPrefix, source_serial)
+        self.config_hash = config_hash
+        self.scope = scope
+        self.fingerprints = {}  # Fingerprint to Container serial
+        self.seen = set()
+        self.read = set()
+        self.__load()
+
+
+    @staticmethod
+    def GetFingerprint(item):
+        return "{}:{}:{}:{}:{}".format(item.Serial, item.Graphic, item.Hue, item.Amount, item.Name)
+
+
+    def Contains(self, item):
+        fingerprint = self.GetFingerprint(item)
+        if fingerprint not in self.fingerprints:
+            return False
+
+        self.seen.add(fingerprint)
+        return True
+
+
+    def Add(self, item):
+        fingerprint = self.GetFingerprint(item)
+        self.fingerprints[fingerprint] = int(item.Container)
+        self.seen.add(fingerprint)
+
+
+    def MarkRead(self, container_serial):
+        """Call for every container whose items were read this run"""
+        self.read.add(int(container_serial))
+
+
+    def Clear(self):
+        self.fingerprints.clear()
+
+
+    def Save(self):
+        AliasUtils.save_json(self.alias, self.scope, {
+            "items": {fingerprint: container for fingerprint, container in self.fingerprints.items() if fingerprint in self.seen or container not in self.read},
+        }, self.config_hash)
+
+
+    def __load(self):
+        data = AliasUtils.get_json(self.alias, self.scope, self.config_hash)
+        if data != None and isinstance(data.get("items"), dict):
+            self.fingerprints = data["items"]
@@ -0,0 +1,66 @@
+class RoutePlanner:
+    """
+    Orders the stops of a route, starting from the player's position.
+    - Nearest-neighbour builds the initial route, 2-opt then removes crossings
+    - Distances are in tiles, where a diagonal step costs the same as a straight one
+    """
+    MaxImprovementPasses = 10
+
+
+    @staticmethod
+    def Distance(first, second):
+        return max(abs(first[0] - second[0]), abs(first[1] - second[1]))
+
+
+    @classmethod
+    def GetLength(cls, start, positions, order):
+        length = 0
+        current = start
+        for i in order:
+            length += cls.Distance(current, positions[i])
+            current = positions[i]
+        return length
+
+
+    @classmethod
+    def Order(cls, start, positions):
+        """Returns the indexes of `positions` in visiting order"""
+        order = cls.__nearestNeighbour(start, positions)
+        return cls.__twoOpt(start, positions, order)
+
+
+    @classmethod
+    def __nearestNeighbour(cls, start, positions):
+        remaining = list(range(len(positions)))
+        order = []
+        current = start
+        while remaining:
+            closest = min(remaining, key=lambda i: cls.Distance(current, positions[i]))
+            remaining.remove(closest)
+            order.append(closest)
+            current = positions[closest]
+        return order
+
+
+    @classmethod
+    def __twoOpt(cls, start, positions, order):
+        # The route doesn't return to the start, so only the edges inside the path are compared
+        points = [start] + [positions[i] for i in order]
+        order = list(order)
+        for _ in range(cls.MaxImprovementPasses):
+            improved = False
+            for i in range(1, len(points) - 1):
+                for j in range(i + 1, len(points)):
+                    before = cls.Distance(points[i - 1], points[i])
+                    after = cls.Distance(points[i - 1], points[j])
+                    if j + 1 < len(points):
+                        before += cls.Distance(points[j], points[j + 1])
+                        after += cls.Distance(points[i], points[j + 1])
+
+                    if after < before:
+                        points[i:j + 1] = reversed(points[i:j + 1])
+                        order[i - 1:j] = reversed(order[i - 1:j])
+                        improved = True
+            if not improved:
+                break
+        return order
@@ -0,0 +1,74 @@
+from tsai._services.filter.tooltipcache import TooltipCache
+from tsai._utils.alias import AliasUtils
+
+
+class SourceSnapshot:
+    """
+    Persisted, per character and per Source, fingerprints of the containers whose items passed no Organizer.
+    - A container is skipped without being opened while its fingerprint (including "contents: X/Y items, Z stones") is unchanged
+    - Any item that passed an Organizer marks its container and every parent up to the Source as changed, so they are read again next run
+    - Entries are only used when the configuration hash matches, like the `NegativeMatchCache` for single items
+    """
+    AliasPrefix = "$yao_snapshot_"
+
+    def __init__(self, source_serial, config_hash, scope):
+        self.alias = "{}{}".format(self.AliasPrefix, source_serial)
+        self.config_hash = config_hash
+        self.scope = scope
+        self.containers = {}
+        self.seen = {}
+        self.changed = set()
+        self.parents = {}
+        self.__load()
+
+
+    @staticmethod
+    def GetFingerprint(item):
+        contents = ""
+        for line in TooltipCache.GetProperties(item):
+            if line.startswith("contents"):
+                contents = line
+                break
+        return "{}:{}:{}:{}:{}".format(item.Serial, item.Graphic, item.Hue, item.Name, contents)
+
+
+    def IsUnchanged(self, item):
+        """Returns `True` if the container was settled last run and its fingerprint is the same"""
+        key = str(item.Serial)
+        fingerprint = self.containers.get(key)
+        if fingerprint == None or fingerprint != self.GetFingerprint(item):
+            return False
+
+        self.seen[key] = fingerprint
+        return True
+
+
+    def Record(self, item):
+        """Call when the container is read, before its items are processed"""
+        key = str(item.Serial)
+        self.seen[key] = self.GetFingerprint(item)
+        self.parents[key] = str(item.Container)
+
+
+    def MarkChanged(self, serial):
+        """Marks the container and its parents, a settled parent would hide the container next run"""
+        key = str(serial)
+        while key != None and key not in self.changed:
+            self.changed.add(key)
+            key = self.parents.get(key)
+
+
+    def Clear(self):
+        self.containers.clear()
+
+
+    def Save(self):
+        AliasUtils.save_json(self.alias, self.scope, {
+            "containers": {key: fingerprint for key, fingerprint in self.seen.items() if key not in self.changed},
+        }, self.config_hash)
+
+
+    def __load(self):
+        data = AliasUtils.get_json(self.alias, self.scope, self.config_hash)
+        if data != None:
+            self.containers = data.get("containers", {})
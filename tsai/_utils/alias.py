@@ -1,5 +1,7 @@
 # import API
 
+import json
+
 
 class AliasUtils:
     @classmethod
@@ -38,6 +40,35 @@ class AliasUtils:
         return serial
 
 
+    @classmethod
+    def get_json(cls, alias, scope, config_hash=None):
+        """
+        Gets the object saved by `save_json`, or `None` if it is missing or corrupt
+        - `config_hash` - Optional. The object is only returned if it was saved with the same hash
+        """
+        value = cls.get_value(alias, scope)
+        if not value: return None
+
+        try:
+            data = json.loads(value)
+        except ValueError:
+            return None  # Corrupt, start over
+
+        if not isinstance(data, dict):
+            return None
+        if config_hash != None and data.get("config") != config_hash:
+            return None
+        return data
+
+
+    @classmethod
+    def save_json(cls, alias, scope, data, config_hash=None):
+        """Saves the `data` dict as JSON, along with the optional `config_hash`"""
+        if config_hash != None:
+            data = dict(data, config=config_hash)
+        API.SavePersistentVar(alias, json.dumps(data), scope)
+
+
     @classmethod
     def remove(cls, alias, scope):
         API.RemovePersistentVar(alias, scope)
\ No newline at end of file